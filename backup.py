@@ -0,0 +1,145 @@
+"""
+Online SQLite backups for the XP database
+Uses SQLite's backup API in small page steps so the bot keeps writing XP while a snapshot is taken
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from db import DB_PATH
+
+BACKUP_PREFIX = 'artifact_bot-'
+DEFAULT_PAGES_PER_STEP = 128
+DEFAULT_STEP_SLEEP = 0.01  # seconds to pause between steps so writers get the lock
+DEFAULT_MAX_RESTARTS = 3
+
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback when concurrent writes keep restarting the copy"""
+
+
+def backup_database(dest_path, db_path=DB_PATH, pages=DEFAULT_PAGES_PER_STEP,
+                    step_sleep=DEFAULT_STEP_SLEEP, max_restarts=DEFAULT_MAX_RESTARTS):
+    """Copy db_path to dest_path a few pages at a time and return the elapsed seconds
+
+    Writes from other connections make SQLite restart a stepped backup. After
+    max_restarts the copy is finished in a single step instead, which in WAL mode
+    only holds a read snapshot and never blocks writers.
+    """
+    started = time.perf_counter()
+    state = {'remaining': None, 'restarts': 0}
+
+    def progress(status, remaining, total):
+        # A restarted copy makes no forward progress on `remaining`
+        if state['remaining'] is not None and remaining >= state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > max_restarts:
+                raise BackupRestarted(f"backup restarted {state['restarts']} times")
+        state['remaining'] = remaining
+        if step_sleep:
+            time.sleep(step_sleep)
+
+    src = sqlite3.connect(db_path)
+    try:
+        dst = sqlite3.connect(dest_path)
+        try:
+            try:
+                src.backup(dst, pages=pages, progress=progress)
+            except BackupRestarted as e:
+                logging.warning(f"Stepped backup gave up ({e}), finishing in one step")
+                src.backup(dst, pages=-1)
+            # The copy inherits WAL mode; keep the snapshot a single self-contained file
+            dst.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    return time.perf_counter() - started
+
+
+def verify_backup(path):
+    """Check a finished backup with integrity_check and a read of the users table"""
+    conn = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True)
+    try:
+        result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        if result != 'ok':
+            raise sqlite3.DatabaseError(f"integrity check failed: {result}")
+        return conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def prune_backups(backup_dir, keep):
+    """Delete all but the newest `keep` backups and return the removed paths"""
+    backups = sorted(Path(backup_dir).glob(f"{BACKUP_PREFIX}*.db"))
+    stale = backups[:-keep] if keep > 0 else []
+    for path in stale:
+        path.unlink()
+    return stale
+
+
+def run_backup(backup_dir='backups', keep=7, db_path=DB_PATH,
+               pages=DEFAULT_PAGES_PER_STEP, step_sleep=DEFAULT_STEP_SLEEP):
+    """Take, verify and rotate one backup; returns (path, user_count, seconds)"""
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    final_path = backup_dir / f"{BACKUP_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+    partial_path = final_path.with_suffix('.partial')
+
+    try:
+        elapsed = backup_database(str(partial_path), db_path, pages, step_sleep)
+        user_count = verify_backup(partial_path)
+    except Exception:
+        if partial_path.exists():
+            partial_path.unlink()
+        raise
+    partial_path.replace(final_path)
+    prune_backups(backup_dir, keep)
+    return final_path, user_count, elapsed
+
+
+class BackupScheduler:
+    """Runs run_backup periodically in a worker thread so the event loop never waits on it"""
+
+    def __init__(self, interval_minutes=None, backup_dir=None, keep=None,
+                 pages=None, step_sleep_ms=None):
+        self.interval = 60 * float(interval_minutes if interval_minutes is not None
+                                   else os.getenv('BACKUP_INTERVAL_MINUTES', '360'))
+        self.backup_dir = backup_dir or os.getenv('BACKUP_DIR', 'backups')
+        self.keep = int(keep if keep is not None else os.getenv('BACKUP_KEEP', '7'))
+        self.pages = int(pages if pages is not None
+                         else os.getenv('BACKUP_PAGES_PER_STEP', str(DEFAULT_PAGES_PER_STEP)))
+        step_sleep_ms = float(step_sleep_ms if step_sleep_ms is not None
+                              else os.getenv('BACKUP_STEP_SLEEP_MS', str(DEFAULT_STEP_SLEEP * 1000)))
+        self.step_sleep = step_sleep_ms / 1000
+        self.task = None
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def start(self):
+        """Start the background loop once; later calls (e.g. on reconnect) are no-ops"""
+        if self.enabled and self.task is None:
+            self.task = asyncio.get_event_loop().create_task(self._loop())
+        return self.task
+
+    async def backup_now(self):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, run_backup, self.backup_dir, self.keep, DB_PATH, self.pages, self.step_sleep
+        )
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                path, user_count, elapsed = await self.backup_now()
+                logging.info(f"Backup written to {path} ({user_count} users, {elapsed:.2f}s)")
+            except Exception as e:
+                logging.error(f"Scheduled backup failed: {e}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures time-to-import of bot.py (with the slowest imports) and time-to-ready against Discord
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+def time_command(args, env=None):
+    started = time.perf_counter()
+    subprocess.run(args, check=True, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def measure_import(runs):
+    """Median wall time of `import bot` above a bare interpreter start"""
+    baseline = statistics.median(time_command([sys.executable, "-c", "pass"]) for _ in range(runs))
+    total = statistics.median(time_command([sys.executable, "-c", "import bot"]) for _ in range(runs))
+    return max(0.0, total - baseline)
+
+
+def slowest_imports(limit):
+    """Top modules by cumulative import time, from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bot"],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def measure_ready(timeout):
+    """Seconds from bot.py starting to load until on_ready, reported by bot.py under STARTUP_BENCH"""
+    env = dict(os.environ, STARTUP_BENCH="1", SYNC_COMMANDS="false", OLLAMA_AUTOSTART="false")
+    result = subprocess.run(
+        [sys.executable, "bot.py"], capture_output=True, text=True, timeout=timeout, env=env
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("{"):
+            return json.loads(line)["ready_seconds"]
+    raise RuntimeError("bot.py exited without reaching on_ready (is DISCORD_TOKEN set?)")
+
+
+def main():
+    """Entry point"""
+    os.chdir(Path(__file__).parent)
+    parser = argparse.ArgumentParser(description="Benchmark Artifact Discord Bot startup")
+    parser.add_argument("--runs", type=int, default=5, help="Import timing repetitions")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--ready", action="store_true", help="Also log in to Discord and time on_ready")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for on_ready")
+    parser.add_argument("--output", help="Append the results as a JSON line to this file")
+    args = parser.parse_args()
+
+    print("⏱️  Artifact Discord Bot Startup Benchmark")
+    print("=" * 50)
+    record = {"time": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0]}
+
+    record["import_seconds"] = measure_import(args.runs)
+    print(f"📦 Time to import bot.py: {record['import_seconds'] * 1000:.0f} ms (median of {args.runs})")
+    print("🐢 Slowest imports (cumulative):")
+    for cumulative_us, self_us, name in slowest_imports(args.top):
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if args.ready:
+        try:
+            record["ready_seconds"] = measure_ready(args.timeout)
+            print(f"🚀 Time to ready: {record['ready_seconds']:.2f} s")
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"❌ Ready benchmark failed: {e}")
+            return 1
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"💾 Results appended to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,33 @@
-import discord
-from discord.ext import commands
-from db import init_db, add_xp, get_user_stats
-from ollama_client import ask_ollama
-import os
-from dotenv import load_dotenv
-import subprocess
 import time
-import socket
-import requests
-import logging
 
-load_dotenv()
-TOKEN = os.getenv("DISCORD_TOKEN")
+_STARTED = time.perf_counter()
 
-if not TOKEN or TOKEN == "your-discord-bot-token-here":
-    print("❌ Error: Please set your DISCORD_TOKEN in the .env file")
-    print("1. Go to https://discord.com/developers/applications")
-    print("2. Create a new application and bot")
-    print("3. Copy the bot token to your .env file")
-    exit(1)
-
-intents = discord.Intents.default()
-intents.messages = True
-intents.message_content = True
-intents.guilds = True
-intents.members = True
+import asyncio
+import json
+import logging
+import os
 
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+import discord
+from discord.ext import commands
 
-# --- Enterprise logging setup ---
-logging.basicConfig(
-    filename='discord_bot.log',
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(message)s'
-)
+from db import init_db, reconcile_server_stats, rollup_activity, HOURLY_RETENTION_HOURS
+from router import ModelRouter
+from inflight import InflightRegistry
+from backup import BackupScheduler
+from sender import OutboundQueue
+from semantic_cache import SemanticCache
+from moderation import Moderator
+from cache_policy import MemberLRU, bot_options, build_intents
+from status_server import start_status_server
+from cogs import EXTENSIONS
+
+# Importing this module has no side effects: configuration, logging and the
+# Ollama probe all happen in main(). subprocess/socket/requests are only
+# imported by the helpers that need them. Commands and event handlers live in
+# the reloadable extensions under cogs/; state they share lives on the bot.
 
 def is_ollama_running(host='localhost', port=11434):
+    import socket
     try:
         with socket.create_connection((host, port), timeout=2):
             return True
@@ -43,6 +35,8 @@ def is_ollama_running(host='localhost', port=11434):
         return False
 
 def ensure_ollama_and_model(model_name='tinyllama:latest', max_wait=30):
+    import subprocess
+    import requests
     # Start Ollama server if not running
     if not is_ollama_running():
         print("🔄 Ollama server not detected. Starting Ollama...")
@@ -70,136 +64,157 @@ def ensure_ollama_and_model(model_name='tinyllama:latest', max_wait=30):
     subprocess.run(["ollama", "pull", model_name], check=False)
     print(f"✅ {model_name} model is ready.")
 
-def ollama_health_check():
-    """Check if Ollama server and model are available."""
-    import requests
-    try:
-        resp = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if resp.status_code == 200 and 'tinyllama' in resp.text:
-            return True
-    except Exception as e:
-        logging.error(f"Ollama health check failed: {e}")
-    return False
-
-# --- Enterprise-level improvements ---
-# 1. Ensure Ollama and model before bot starts
-# 2. Add robust error handling and logging
-# 3. Add health check endpoint (optional for ops)
-# 4. Add graceful shutdown for subprocesses (future)
-# 5. Add startup diagnostics
-
-try:
-    ensure_ollama_and_model()
-except Exception as e:
-    print(f"[Startup Error] {e}")
-    exit(1)
-
-@bot.event
-async def on_ready():
-    print(f"[BOT] {bot.user} is now online!")
-    print(f"[STATS] Connected to {len(bot.guilds)} guilds")
-    init_db()
-    # Set bot status
-    activity = discord.Activity(type=discord.ActivityType.listening, name="!help for commands")
-    await bot.change_presence(activity=activity)
-
-@bot.event
-async def on_message(message):
-    if message.author.bot:
-        return
-
-    # Add XP for active users
-    add_xp(str(message.author.id), 5)
-    
-    # Process bot commands
-    await bot.process_commands(message)
-
-@bot.command(name='ask')
-async def ask_command(ctx, *, question):
-    """Ask the AI a question using !ask <your question>"""
-    if not question:
-        await ctx.send("[?] Please provide a question! Usage: `!ask <your question>`")
-        return
-    if not ollama_health_check():
-        await ctx.send("[X] Ollama AI backend is not available. Please try again later or contact support.")
-        logging.error("Ollama backend unavailable when answering user question.")
-        return
-    async with ctx.typing():
+class ArtifactBot(commands.Bot):
+    """Bot with startup work moved off the import path and out of the login critical path
+
+    Everything that must survive `!reload` (caches, queues, router load,
+    in-flight generations) is an attribute here rather than in a cog.
+    """
+
+    def __init__(self):
+        intents = build_intents()
+        cache_options = bot_options(intents)
+        super().__init__(command_prefix="!", help_command=None, **cache_options)
+        self.cache_options = cache_options
+        self.member_lru = MemberLRU()
+        self.backup_scheduler = BackupScheduler()
+        self.semantic_cache = SemanticCache.from_env()
+        self.router = ModelRouter.from_env()
+        self.ready_seconds = None
+        self.started_at = time.time()
+        self.status_runner = None
+        self.rollup_task = None
+        self.inflight = InflightRegistry()
+        self.ollama_session = None
+        self.outbound = OutboundQueue()
+        self.moderator = Moderator.from_env()
+
+    async def setup_hook(self):
+        import aiohttp
+
+        init_db()
+        # One pooled session for all generations; created here so it binds to the running loop
+        self.ollama_session = aiohttp.ClientSession()
+        for extension in EXTENSIONS:
+            await self.load_extension(extension)
+        # Probe/start Ollama in the background instead of blocking login on it
+        if os.getenv("OLLAMA_AUTOSTART", "true").lower() != "false":
+            self.loop.create_task(self._ensure_ollama())
+        self.backup_scheduler.start()
+        if self.moderator is not None:
+            self.moderator.start(self)
+        if self.rollup_task is None:
+            self.rollup_task = self.loop.create_task(self._maintenance_loop())
+        if self.status_runner is None:
+            try:
+                self.status_runner = await start_status_server(self)
+            except OSError as e:
+                logging.error(f"Status endpoint failed to start: {e}")
+        # Off by default: the global tree only changes on deploys, and the owner has !sync.
+        # When on, sync in the background so the REST round trip stays off time-to-ready.
+        if os.getenv("SYNC_COMMANDS", "false").lower() in ("1", "true", "yes", "on"):
+            self.loop.create_task(self.sync_app_commands())
+
+    async def close(self):
+        self.inflight.cancel_all()
+        if self.status_runner is not None:
+            await self.status_runner.cleanup()
+        if self.ollama_session is not None:
+            await self.ollama_session.close()
+        await super().close()
+
+    async def _ensure_ollama(self):
+        try:
+            await self.loop.run_in_executor(None, ensure_ollama_and_model)
+        except Exception as e:
+            print(f"[Startup Error] {e}")
+            logging.error(f"Ollama startup failed: {e}")
+
+    async def _maintenance_loop(self):
+        """Periodic database upkeep off the event loop
+
+        Folds closed hourly XP buckets into the daily/weekly tables every
+        ACTIVITY_ROLLUP_MINUTES, and checks the trigger-maintained server stats
+        against a full scan every STATS_RECONCILE_HOURS.
+        """
+        interval = 60 * float(os.getenv("ACTIVITY_ROLLUP_MINUTES", "60"))
+        retention = int(os.getenv("ACTIVITY_RETENTION_HOURS", str(HOURLY_RETENTION_HOURS)))
+        reconcile_every = 3600 * float(os.getenv("STATS_RECONCILE_HOURS", "24"))
+        next_reconcile = time.monotonic() + reconcile_every
+        while True:
+            try:
+                rolled = await self.loop.run_in_executor(None, lambda: rollup_activity(retention_hours=retention))
+                logging.info(f"Activity rollup folded {rolled} hourly buckets")
+            except Exception as e:
+                logging.error(f"Activity rollup failed: {e}")
+            if reconcile_every > 0 and time.monotonic() >= next_reconcile:
+                next_reconcile = time.monotonic() + reconcile_every
+                try:
+                    ok, stored, actual = await self.loop.run_in_executor(None, reconcile_server_stats)
+                    if not ok:
+                        logging.warning(f"Server stats drifted (stored {stored}, actual {actual}); rebuilt")
+                except Exception as e:
+                    logging.error(f"Server stats reconciliation failed: {e}")
+            await asyncio.sleep(max(60, interval))
+
+    async def sync_app_commands(self):
+        """Push the slash command tree to Discord (to one guild if SYNC_GUILD_ID is set)"""
+        guild_id = os.getenv("SYNC_GUILD_ID")
         try:
-            reply = ask_ollama(question)
-            # Split long messages if needed
-            if len(reply) > 2000:
-                chunks = [reply[i:i+2000] for i in range(0, len(reply), 2000)]
-                for chunk in chunks:
-                    await ctx.send(chunk)
+            if guild_id:
+                guild = discord.Object(id=int(guild_id))
+                self.tree.copy_global_to(guild=guild)
+                synced = await self.tree.sync(guild=guild)
             else:
-                await ctx.send(reply)
+                synced = await self.tree.sync()
+            print(f"[BOT] Synced {len(synced)} slash commands")
         except Exception as e:
-            await ctx.send(f"[X] Error processing your request: {str(e)}")
-            logging.error(f"Error in ask_command: {e}")
-
-@bot.command(name='stats')
-async def stats_command(ctx, member: discord.Member = None):
-    """Check your or someone else's XP and level"""
-    target = member or ctx.author
-    user_id = str(target.id)
-    try:
-        stats = get_user_stats(user_id)
-        if stats:
-            xp, level = stats
-            embed = discord.Embed(
-                title=f"[STATS] Stats for {target.display_name}",
-                color=0x00ff00
-            )
-            embed.add_field(name="Level", value=level, inline=True)
-            embed.add_field(name="XP", value=xp, inline=True)
-            embed.set_thumbnail(url=target.avatar.url if target.avatar else None)
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(f"[i] No stats found for {target.display_name}")
-    except Exception as e:
-        await ctx.send(f"[X] Error retrieving stats: {str(e)}")
-
-@bot.command(name='help')
-async def help_command(ctx):
-    """Show available commands"""
-    embed = discord.Embed(
-        title="[BOT] Artifact Discord Bot Commands",
-        description="Here are the available commands:",
-        color=0x0099ff
-    )
-    embed.add_field(
-        name="!ask <question>", 
-        value="Ask the AI a question", 
-        inline=False
+            logging.error(f"Slash command sync failed: {e}")
+
+    async def on_ready(self):
+        if self.ready_seconds is None:
+            self.ready_seconds = time.perf_counter() - _STARTED
+            logging.info(f"Time to ready: {self.ready_seconds:.2f}s")
+            if os.getenv("STARTUP_BENCH"):
+                # Consumed by bench_startup.py, which only needs the timing
+                print(json.dumps({'ready_seconds': self.ready_seconds}), flush=True)
+                await self.close()
+                return
+        print(f"[BOT] {self.user} is now online! (ready in {self.ready_seconds:.2f}s)")
+        print(f"[STATS] Connected to {len(self.guilds)} guilds")
+        # Set bot status
+        activity = discord.Activity(type=discord.ActivityType.listening, name="!help for commands")
+        await self.change_presence(activity=activity)
+
+def main():
+    """Load configuration and run the bot"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    token = os.getenv("DISCORD_TOKEN")
+    if not token or token == "your-discord-bot-token-here":
+        print("❌ Error: Please set your DISCORD_TOKEN in the .env file")
+        print("1. Go to https://discord.com/developers/applications")
+        print("2. Create a new application and bot")
+        print("3. Copy the bot token to your .env file")
+        return 1
+
+    # --- Enterprise logging setup ---
+    logging.basicConfig(
+        filename='discord_bot.log',
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s %(message)s'
     )
-    embed.add_field(
-        name="!stats [@user]", 
-        value="Check XP and level stats", 
-        inline=False
-    )
-    embed.add_field(
-        name="!help", 
-        value="Show this help message", 
-        inline=False
-    )
-    embed.set_footer(text="Powered by Artifact Virtual System")
-    await ctx.send(embed=embed)
-
-@bot.event
-async def on_command_error(ctx, error):
-    if isinstance(error, commands.CommandNotFound):
-        await ctx.send("[?] Unknown command! Use `!help` to see available commands.")
-    elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"[X] Missing required argument: {error.param}")
-    else:
-        await ctx.send(f"[X] An error occurred: {str(error)}")
-        print(f"Error in command {ctx.command}: {error}")
 
-if __name__ == "__main__":
     try:
-        bot.run(TOKEN)
+        ArtifactBot().run(token)
     except discord.LoginFailure:
         print("❌ Invalid Discord token! Please check your .env file.")
+        return 1
     except Exception as e:
         print(f"❌ Failed to start bot: {str(e)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
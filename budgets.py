@@ -0,0 +1,78 @@
+"""
+Generation budgets for !ask
+Per-request token and time limits, with optional guild/role tiers, so one question can't hold the model
+"""
+
+import json
+import logging
+import os
+from collections import namedtuple
+
+Budget = namedtuple('Budget', 'input_tokens output_tokens timeout')
+
+_tiers = None
+
+
+def default_budget():
+    """Budget from ASK_INPUT_TOKENS / ASK_OUTPUT_TOKENS / OLLAMA_TIMEOUT"""
+    return Budget(
+        input_tokens=int(os.getenv('ASK_INPUT_TOKENS', '512')),
+        output_tokens=int(os.getenv('ASK_OUTPUT_TOKENS', '384')),
+        timeout=float(os.getenv('OLLAMA_TIMEOUT', '30')),
+    )
+
+
+def load_tiers():
+    """Parse ASK_BUDGET_TIERS, e.g. {"guilds": {"<id>": {...}}, "roles": {"<id>": {...}}}
+
+    Each tier may override input_tokens, output_tokens and timeout; omitted
+    fields fall back to the default budget.
+    """
+    global _tiers
+    if _tiers is None:
+        raw = os.getenv('ASK_BUDGET_TIERS', '').strip()
+        try:
+            config = json.loads(raw) if raw else {}
+        except ValueError as e:
+            logging.error(f"Ignoring invalid ASK_BUDGET_TIERS: {e}")
+            config = {}
+        if not isinstance(config, dict):
+            logging.error("Ignoring invalid ASK_BUDGET_TIERS: expected a JSON object")
+            config = {}
+        base = default_budget()
+        _tiers = {'guilds': {}, 'roles': {}}
+        for kind in _tiers:
+            entries = config.get(kind) or {}
+            if not isinstance(entries, dict):
+                logging.error(f"Ignoring ASK_BUDGET_TIERS {kind}: expected an object of id -> budget")
+                continue
+            for key, value in entries.items():
+                try:
+                    _tiers[kind][str(key)] = _tier_budget(base, value)
+                except (TypeError, ValueError) as e:
+                    logging.error(f"Ignoring ASK_BUDGET_TIERS {kind} entry {key}: {e}")
+    return _tiers
+
+
+def _tier_budget(base, value):
+    """Default budget with a tier's overrides applied, cast to the right types"""
+    if not isinstance(value, dict):
+        raise ValueError("expected an object")
+    unknown = set(value) - set(Budget._fields)
+    if unknown:
+        raise ValueError(f"unknown fields {', '.join(sorted(unknown))} (use {', '.join(Budget._fields)})")
+    fields = {name: (float if name == 'timeout' else int)(raw) for name, raw in value.items()}
+    if any(v <= 0 for v in fields.values()):
+        raise ValueError("limits must be positive")
+    return base._replace(**fields)
+
+
+def resolve_budget(guild_id=None, role_ids=()):
+    """Pick the budget for a request: the most generous matching role tier, else the guild tier, else the default"""
+    tiers = load_tiers()
+    role_budgets = [tiers['roles'][str(r)] for r in role_ids if str(r) in tiers['roles']]
+    if role_budgets:
+        return max(role_budgets, key=lambda b: (b.output_tokens, b.input_tokens, b.timeout))
+    if guild_id is not None and str(guild_id) in tiers['guilds']:
+        return tiers['guilds'][str(guild_id)]
+    return default_budget()
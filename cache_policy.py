@@ -0,0 +1,162 @@
+"""
+Member cache and intents policy
+Lets each deployment trade memory against API calls on large guilds
+"""
+
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+
+import discord
+from discord.ext import commands
+
+MENTION_RE = re.compile(r'^<@!?(\d{15,21})>$|^(\d{15,21})$')
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def build_intents():
+    """Gateway intents; MEMBERS_INTENT / MESSAGE_CONTENT_INTENT can turn off the privileged ones"""
+    intents = discord.Intents.default()
+    intents.messages = True
+    intents.guilds = True
+    # Slash commands don't need message content; turn it off to run without the privileged intent
+    intents.message_content = _env_flag('MESSAGE_CONTENT_INTENT', 'true')
+    intents.members = _env_flag('MEMBERS_INTENT', 'true')
+    return intents
+
+
+def member_cache_flags(intents):
+    """MemberCacheFlags from MEMBER_CACHE: all, none, or a comma list of voice/joined"""
+    policy = os.getenv('MEMBER_CACHE', 'all').strip().lower()
+    if policy == 'all':
+        flags = discord.MemberCacheFlags.from_intents(intents)
+    elif policy in ('', 'none'):
+        flags = discord.MemberCacheFlags.none()
+    else:
+        flags = discord.MemberCacheFlags.none()
+        for name in policy.split(','):
+            name = name.strip()
+            if name in ('voice', 'joined'):
+                setattr(flags, name, True)
+            else:
+                logging.warning(f"Unknown MEMBER_CACHE flag ignored: {name}")
+    if flags.joined and not intents.members:
+        logging.warning("MEMBER_CACHE=joined needs MEMBERS_INTENT; disabling joined caching")
+        flags.joined = False
+    return flags
+
+
+def bot_options(intents):
+    """Keyword arguments for commands.Bot implementing the configured cache policy"""
+    max_messages = int(os.getenv('MESSAGE_CACHE_SIZE', '1000'))
+    return {
+        'intents': intents,
+        'member_cache_flags': member_cache_flags(intents),
+        'chunk_guilds_at_startup': intents.members and _env_flag('CHUNK_GUILDS_AT_STARTUP', 'false'),
+        'max_messages': max_messages if max_messages > 0 else None,
+    }
+
+
+class MemberLRU:
+    """Bounded cache of members fetched on demand, keyed by (guild_id, user_id)"""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize if maxsize is not None else int(os.getenv('MEMBER_LRU_SIZE', '1024'))
+        self._members = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._members)
+
+    def get(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        member = self._members.get(key)
+        if member is None:
+            self.misses += 1
+            return None
+        self._members.move_to_end(key)
+        self.hits += 1
+        return member
+
+    def put(self, member):
+        if self.maxsize <= 0:
+            return
+        key = (member.guild.id, member.id)
+        self._members[key] = member
+        self._members.move_to_end(key)
+        while len(self._members) > self.maxsize:
+            self._members.popitem(last=False)
+
+    def discard(self, guild_id, user_id):
+        self._members.pop((guild_id, user_id), None)
+
+
+async def resolve_member(guild, user_id, lru):
+    """Member from the gateway cache, then the LRU, then a single REST fetch"""
+    member = guild.get_member(user_id) or lru.get(guild.id, user_id)
+    if member is None:
+        member = await guild.fetch_member(user_id)
+        lru.put(member)
+    return member
+
+
+class LazyMember(commands.MemberConverter):
+    """Member converter that resolves mentions/IDs through the bounded LRU before hitting the API"""
+
+    async def convert(self, ctx, argument):
+        match = MENTION_RE.match(argument)
+        lru = getattr(ctx.bot, 'member_lru', None)
+        if match and ctx.guild is not None and lru is not None:
+            user_id = int(match.group(1) or match.group(2))
+            try:
+                return await resolve_member(ctx.guild, user_id, lru)
+            except discord.NotFound:
+                raise commands.MemberNotFound(argument)
+        return await super().convert(ctx, argument)
+
+
+def current_rss():
+    """Resident set size in bytes, or None if it can't be read on this platform"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+def memory_report(bot):
+    """Snapshot of process memory and the sizes of discord.py's caches"""
+    guilds = bot.guilds
+    lru = getattr(bot, 'member_lru', None)
+    options = getattr(bot, 'cache_options', {})
+    return {
+        'rss': current_rss(),
+        'guilds': len(guilds),
+        'cached_members': sum(len(g.members) for g in guilds),
+        'member_counts': sum(g.member_count or 0 for g in guilds),
+        'cached_users': len(bot.users),
+        'cached_messages': len(bot.cached_messages),
+        'lru_members': len(lru) if lru is not None else 0,
+        'lru_hits': lru.hits if lru is not None else 0,
+        'lru_misses': lru.misses if lru is not None else 0,
+        'member_cache_flags': options.get('member_cache_flags'),
+        'chunk_at_startup': options.get('chunk_guilds_at_startup'),
+        'message_cache_size': options.get('max_messages'),
+    }
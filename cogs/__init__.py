@@ -0,0 +1,14 @@
+"""
+Bot extensions
+Commands and event handlers live here so `!reload` can swap them on the running
+bot. Long-lived state (caches, queues, the router, in-flight generations) is
+kept on the bot object, not in these modules, so it survives a reload.
+"""
+
+EXTENSIONS = (
+    'cogs.ask',
+    'cogs.xp',
+    'cogs.admin',
+    'cogs.moderation',
+    'cogs.general',
+)
@@ -0,0 +1,129 @@
+"""
+Admin diagnostics and hot reload: !memory, !models, !profile, !reload, !sync
+"""
+
+import logging
+import time
+
+import discord
+from discord.ext import commands
+
+from cache_policy import memory_report
+from cogs import EXTENSIONS
+from profiler import MAX_SECONDS, ProfilerBusy, profile_for
+from sender import split_message
+
+def _format_bytes(value):
+    if value is None:
+        return "unknown"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            return f"{value:.1f} {unit}"
+        value /= 1024
+
+class AdminCog(commands.Cog):
+    """Diagnostics for server administrators; process-wide controls for the bot owner"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name='memory')
+    @commands.has_permissions(administrator=True)
+    async def memory_command(self, ctx):
+        """Show process memory and cache sizes (admin only)"""
+        report = memory_report(self.bot)
+        embed = discord.Embed(title="[MEMORY] Cache Report", color=0x9b59b6)
+        embed.add_field(name="RSS", value=_format_bytes(report['rss']), inline=True)
+        embed.add_field(name="Guilds", value=report['guilds'], inline=True)
+        embed.add_field(name="Cached members", value=f"{report['cached_members']} / {report['member_counts']}", inline=True)
+        embed.add_field(name="Cached users", value=report['cached_users'], inline=True)
+        embed.add_field(name="Cached messages", value=f"{report['cached_messages']} / {report['message_cache_size']}", inline=True)
+        embed.add_field(
+            name="Member LRU",
+            value=f"{report['lru_members']} entries, {report['lru_hits']} hits / {report['lru_misses']} misses",
+            inline=False
+        )
+        embed.add_field(
+            name="Policy",
+            value=f"{report['member_cache_flags']}, chunk at startup: {report['chunk_at_startup']}",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='models')
+    @commands.has_permissions(administrator=True)
+    async def models_command(self, ctx):
+        """Show model routing load and answer counts (admin only)"""
+        router = self.bot.router
+        embed = discord.Embed(
+            title="[MODELS] Routing",
+            description=f"fast: `{router.fast}` | primary: `{router.primary}` | large: `{router.large}`",
+            color=0x1abc9c
+        )
+        for model, load in router.snapshot().items():
+            embed.add_field(
+                name=model,
+                value=f"{load['answered']} answered, {load['inflight']} in flight, p90 {load['p90']:.1f}s",
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    # Profiles the whole process (every guild's traffic) for up to MAX_SECONDS, so bot-owner only
+    @commands.command(name='profile')
+    @commands.is_owner()
+    async def profile_command(self, ctx, seconds: float = 10.0):
+        """Profile the live bot for N seconds and post the hottest functions (owner only)"""
+        await ctx.send(f"[PROFILE] Profiling for {min(seconds, MAX_SECONDS):.0f}s...")
+        try:
+            report, path = await profile_for(seconds)
+        except ProfilerBusy as e:
+            await ctx.send(f"[X] {e}")
+            return
+        chunks = split_message(f"```\n{report}\n```")
+        for chunk in chunks[:-1]:
+            await ctx.send(chunk)
+        try:
+            await ctx.send(chunks[-1], file=discord.File(str(path)))
+        except discord.HTTPException:
+            # Too large to attach; it's still on disk
+            await ctx.send(chunks[-1])
+
+    # Reloading swaps code for the whole process, not one guild, so it is bot-owner only
+    @commands.command(name='reload')
+    @commands.is_owner()
+    async def reload_command(self, ctx, extension: str = 'all'):
+        """Reload one command module (e.g. `ask`) or all of them in place (owner only)"""
+        if extension == 'all':
+            names = EXTENSIONS
+        else:
+            names = (extension if extension.startswith('cogs.') else f'cogs.{extension}',)
+        lines = []
+        for name in names:
+            started = time.perf_counter()
+            try:
+                # Atomic: if the new code fails to import or set up, the old version stays loaded
+                await self.bot.reload_extension(name)
+            except commands.ExtensionNotLoaded:
+                try:
+                    await self.bot.load_extension(name)
+                except commands.ExtensionError as e:
+                    lines.append(f"[X] `{name}`: {e}")
+                    continue
+            except commands.ExtensionError as e:
+                lines.append(f"[X] `{name}`: {e}")
+                logging.error(f"Reload of {name} failed: {e}")
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            lines.append(f"[OK] `{name}` reloaded in {elapsed:.1f} ms")
+            logging.info(f"Reloaded {name} in {elapsed:.1f} ms")
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name='sync')
+    @commands.is_owner()
+    async def sync_command(self, ctx):
+        """Push slash command changes to Discord after a reload (owner only)"""
+        await self.bot.sync_app_commands()
+        await ctx.send("[OK] Slash commands synced.")
+
+async def setup(bot):
+    await bot.add_cog(AdminCog(bot))
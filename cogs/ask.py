@@ -0,0 +1,149 @@
+"""
+!ask, /ask and !cancel
+"""
+
+import asyncio
+import logging
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from budgets import resolve_budget
+from inflight import run_cancellable
+from ollama_client import ask_ollama_async, embed
+from sender import split_message
+
+OLLAMA_UNAVAILABLE = "[X] Ollama AI backend is not available. Please try again later or contact support."
+
+def ollama_health_check():
+    """Check if Ollama server and model are available."""
+    import requests
+    try:
+        resp = requests.get("http://localhost:11434/api/tags", timeout=5)
+        if resp.status_code == 200 and 'tinyllama' in resp.text:
+            return True
+    except Exception as e:
+        logging.error(f"Ollama health check failed: {e}")
+    return False
+
+async def generate_answer(client, question, guild, author):
+    """Answer a question for an author without blocking the event loop
+
+    Checks the semantic cache first when one is configured, then routes the
+    question to a model tier under the author's generation budget. Returns the
+    reply with a model/token/latency footer, or None if Ollama is down.
+    Cancelling the task running this aborts the generation.
+    """
+    loop = asyncio.get_event_loop()
+    if not await loop.run_in_executor(None, ollama_health_check):
+        logging.error("Ollama backend unavailable when answering user question.")
+        return None
+
+    cache = client.semantic_cache
+    vector = None
+    if cache is not None:
+        started = time.perf_counter()
+        vector = await loop.run_in_executor(None, embed, question)
+        hit = vector and await loop.run_in_executor(None, cache.lookup, vector)
+        if hit:
+            answer, similarity = hit
+            elapsed = time.perf_counter() - started
+            logging.info(f"ask: semantic cache hit (similarity {similarity:.3f}) in {elapsed:.3f}s")
+            return f"{answer}\n-# cached answer (similarity {similarity:.2f}) · {elapsed:.2f}s"
+
+    role_ids = [role.id for role in getattr(author, 'roles', [])]
+    budget = resolve_budget(guild.id if guild else None, role_ids)
+    model, reason = client.router.choose(question, role_ids)
+    client.router.begin(model)
+    result = None
+    try:
+        # Streamed on the event loop so a cancel closes the connection and Ollama stops generating
+        result = await ask_ollama_async(question, budget, model, session=client.ollama_session)
+    finally:
+        client.router.finish(model, result.elapsed if result else None,
+                             ok=result is not None and not result.error)
+    logging.info(f"ask: {result.model} ({reason}) {result.prompt_tokens} in / {result.output_tokens} out "
+                 f"tokens in {result.elapsed:.2f}s (truncated={result.truncated})")
+    # Only complete answers are cached: one cut short by a small tier's budget
+    # must not be served later to someone with a bigger one
+    cut_short = result.truncated or result.output_tokens >= budget.output_tokens
+    if vector and not result.error and not cut_short:
+        loop.run_in_executor(None, _cache_answer, cache, question, vector, result.text)
+    return f"{result.text}\n{result.footer()}"
+
+def _cache_answer(cache, question, vector, answer):
+    """Insert into the semantic cache off the event loop; nobody awaits it, so failures are logged here"""
+    try:
+        cache.insert(question, vector, answer)
+    except Exception as e:
+        logging.error(f"Semantic cache insert failed: {e}")
+
+class AskCog(commands.Cog):
+    """AI question answering"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name='ask')
+    async def ask_command(self, ctx, *, question):
+        """Ask the AI a question using !ask <your question>"""
+        if not question:
+            await ctx.send("[?] Please provide a question! Usage: `!ask <your question>`")
+            return
+        async with ctx.typing():
+            try:
+                # A newer question, !cancel or deleting this message aborts the generation
+                task = self.bot.inflight.start(
+                    ctx.author.id, generate_answer(self.bot, question, ctx.guild, ctx.author), ctx.message.id
+                )
+                reply, cancelled = await run_cancellable(task)
+                if cancelled:
+                    return
+                if reply is None:
+                    await ctx.send(OLLAMA_UNAVAILABLE)
+                    return
+                # Markdown-aware split, paced against Discord's rate limits
+                await self.bot.outbound.send_long(ctx.channel, reply)
+            except Exception as e:
+                await ctx.send(f"[X] Error processing your request: {str(e)}")
+                logging.error(f"Error in ask_command: {e}")
+
+    @commands.command(name='cancel')
+    async def cancel_command(self, ctx):
+        """Stop your question that is still being answered"""
+        if self.bot.inflight.cancel_user(ctx.author.id):
+            await ctx.send("[X] Cancelled your question.")
+        else:
+            await ctx.send("[?] You have no question being answered.")
+
+    @app_commands.command(name='ask', description="Ask the AI a question")
+    @app_commands.describe(question="Your question for Arty")
+    async def ask_slash(self, interaction: discord.Interaction, question: str):
+        # Acknowledge within Discord's 3 second window; the answer follows up later
+        await interaction.response.defer(thinking=True)
+        try:
+            task = self.bot.inflight.start(
+                interaction.user.id, generate_answer(self.bot, question, interaction.guild, interaction.user)
+            )
+            reply, cancelled = await run_cancellable(task)
+            if cancelled:
+                await interaction.followup.send("[X] Question cancelled.")
+                return
+            if reply is None:
+                await interaction.followup.send(OLLAMA_UNAVAILABLE)
+                return
+            for chunk in split_message(reply):
+                await interaction.followup.send(chunk)
+        except Exception as e:
+            await interaction.followup.send(f"[X] Error processing your request: {str(e)}")
+            logging.error(f"Error in ask_slash: {e}")
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        # Raw event so it fires even when the !ask message has left the message cache
+        self.bot.inflight.cancel_message(payload.message_id)
+
+async def setup(bot):
+    await bot.add_cog(AskCog(bot))
@@ -0,0 +1,71 @@
+"""
+!help and command error replies
+"""
+
+import discord
+from discord.ext import commands
+
+class GeneralCog(commands.Cog):
+    """Help and error handling shared by every command"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name='help')
+    async def help_command(self, ctx):
+        """Show available commands"""
+        embed = discord.Embed(
+            title="[BOT] Artifact Discord Bot Commands",
+            description="Here are the available commands:",
+            color=0x0099ff
+        )
+        embed.add_field(
+            name="!ask <question>",
+            value="Ask the AI a question",
+            inline=False
+        )
+        embed.add_field(
+            name="!cancel",
+            value="Stop your question that is still being answered",
+            inline=False
+        )
+        embed.add_field(
+            name="!stats [@user]",
+            value="Check XP and level stats",
+            inline=False
+        )
+        embed.add_field(
+            name="!leaderboard [week|day]",
+            value="Show the top members by XP, all time or for this week/today",
+            inline=False
+        )
+        embed.add_field(
+            name="!activity [@user]",
+            value="Show XP earned per day over the last week",
+            inline=False
+        )
+        embed.add_field(
+            name="!serverstats",
+            value="Show XP totals across every server the bot is in",
+            inline=False
+        )
+        embed.add_field(
+            name="!help",
+            value="Show this help message",
+            inline=False
+        )
+        embed.set_footer(text="Slash versions: /ask, /stats, /leaderboard | Powered by Artifact Virtual System")
+        await ctx.send(embed=embed)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        if isinstance(error, commands.CommandNotFound):
+            await ctx.send("[?] Unknown command! Use `!help` to see available commands.")
+        elif isinstance(error, commands.MissingRequiredArgument):
+            await ctx.send(f"[X] Missing required argument: {error.param}")
+        else:
+            await ctx.send(f"[X] An error occurred: {str(error)}")
+            print(f"Error in command {ctx.command}: {error}")
+
+async def setup(bot):
+    await bot.add_cog(GeneralCog(bot))
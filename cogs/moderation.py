@@ -0,0 +1,61 @@
+"""
+Moderation pre-filter hooks and !moderation
+"""
+
+import discord
+from discord.ext import commands
+
+class ModerationCog(commands.Cog):
+    """Runs every guild message through the bot's blocklist pre-filter"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def _screen(self, message):
+        moderator = self.bot.moderator
+        if moderator is None or message.guild is None or message.author.bot:
+            return
+        matched = moderator.check(message.content)
+        if matched is not None:
+            moderator.submit(message, matched)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        self._screen(message)
+
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        if before.content != after.content:
+            self._screen(after)
+
+    @commands.command(name='moderation')
+    @commands.has_permissions(administrator=True)
+    async def moderation_command(self, ctx):
+        """Show moderation filter counters (admin only)"""
+        moderator = self.bot.moderator
+        if moderator is None:
+            await ctx.send("[?] Moderation is turned off (MODERATION=false).")
+            return
+        stats = moderator.stats()
+        embed = discord.Embed(
+            title="[MOD] Moderation Filter",
+            description=f"{stats['terms']} blocklist entries from `{moderator.path}`",
+            color=0xe74c3c
+        )
+        embed.add_field(name="Checked", value=stats['checked'], inline=True)
+        embed.add_field(name="Matched", value=stats['matched'], inline=True)
+        embed.add_field(name="Confirmed", value=stats['confirmed'], inline=True)
+        embed.add_field(
+            name="Review queue",
+            value=f"{stats['queued']} waiting, {stats['dropped']} dropped, {stats['reviewed']} reviewed",
+            inline=False
+        )
+        embed.add_field(
+            name="Policy",
+            value=f"action: {stats['action']}, LLM review: {'on' if stats['review'] else 'off'}",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(ModerationCog(bot))
@@ -0,0 +1,145 @@
+"""
+XP awards, !stats, !leaderboard, !activity and !serverstats
+"""
+
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from cache_policy import LazyMember
+from db import add_xp, get_user_stats, get_leaderboard, get_period_leaderboard, get_activity, get_server_stats
+
+PERIODS = {'all': "Top Members", 'week': "Top Members This Week", 'day': "Top Members Today"}
+
+def build_stats_embed(target):
+    """Embed with a member's XP and level"""
+    xp, level = get_user_stats(str(target.id))
+    embed = discord.Embed(
+        title=f"[STATS] Stats for {target.display_name}",
+        color=0x00ff00
+    )
+    embed.add_field(name="Level", value=level, inline=True)
+    embed.add_field(name="XP", value=xp, inline=True)
+    embed.set_thumbnail(url=target.avatar.url if target.avatar else None)
+    return embed
+
+def build_leaderboard_embed(limit=10, period='all'):
+    """Embed with the top users by lifetime XP, or by XP earned this week/today"""
+    if period == 'all':
+        lines = [
+            f"**{rank}.** <@{user_id}> - Level {level} ({xp} XP)"
+            for rank, (user_id, xp, level) in enumerate(get_leaderboard(limit), start=1)
+        ]
+    else:
+        lines = [
+            f"**{rank}.** <@{user_id}> - {xp} XP"
+            for rank, (user_id, xp) in enumerate(get_period_leaderboard(period, limit), start=1)
+        ]
+    return discord.Embed(
+        title=f"[LEADERBOARD] {PERIODS[period]}",
+        description="\n".join(lines) or "No XP recorded yet.",
+        color=0xffd700
+    )
+
+def build_activity_embed(target, days=7):
+    """Embed with a member's XP per day over the last week"""
+    rows = get_activity(str(target.id), days)
+    peak = max((xp for _, xp in rows), default=0) or 1
+    lines = [
+        f"`{time.strftime('%a %d %b', time.gmtime(day * 86400))}` {'█' * round(10 * xp / peak) or '·'} {xp}"
+        for day, xp in rows
+    ]
+    embed = discord.Embed(
+        title=f"[ACTIVITY] {target.display_name} - last {days} days",
+        description="\n".join(lines),
+        color=0x00ff00
+    )
+    embed.set_footer(text=f"{sum(xp for _, xp in rows)} XP this period (UTC days)")
+    return embed
+
+def build_server_stats_embed():
+    """Embed with XP totals across every guild the bot is in, read from the summary table"""
+    user_count, total_xp, max_level = get_server_stats()
+    embed = discord.Embed(
+        title="[SERVER] Bot-wide XP Stats",
+        color=0xffd700
+    )
+    embed.add_field(name="Users with XP", value=f"{user_count:,}", inline=True)
+    embed.add_field(name="Total XP", value=f"{total_xp:,}", inline=True)
+    embed.add_field(name="Highest level", value=max_level, inline=True)
+    return embed
+
+class XPCog(commands.Cog):
+    """XP for activity and the commands that report it"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author.bot:
+            return
+
+        # Add XP for active users
+        add_xp(str(message.author.id), 5)
+
+    @commands.command(name='stats')
+    async def stats_command(self, ctx, member: LazyMember = None):
+        """Check your or someone else's XP and level"""
+        target = member or ctx.author
+        try:
+            await ctx.send(embed=build_stats_embed(target))
+        except Exception as e:
+            await ctx.send(f"[X] Error retrieving stats: {str(e)}")
+
+    @commands.command(name='leaderboard')
+    async def leaderboard_command(self, ctx, period: str = 'all'):
+        """Show the top members by XP (all time, this week or today)"""
+        period = period.lower()
+        if period not in PERIODS:
+            await ctx.send("[?] Usage: `!leaderboard [all|week|day]`")
+            return
+        try:
+            await ctx.send(embed=build_leaderboard_embed(period=period))
+        except Exception as e:
+            await ctx.send(f"[X] Error retrieving leaderboard: {str(e)}")
+
+    @commands.command(name='activity')
+    async def activity_command(self, ctx, member: LazyMember = None):
+        """Show your or someone else's XP per day for the last week"""
+        target = member or ctx.author
+        try:
+            await ctx.send(embed=build_activity_embed(target))
+        except Exception as e:
+            await ctx.send(f"[X] Error retrieving activity: {str(e)}")
+
+    @commands.command(name='serverstats')
+    async def serverstats_command(self, ctx):
+        """Show XP totals across every server the bot is in"""
+        try:
+            await ctx.send(embed=build_server_stats_embed())
+        except Exception as e:
+            await ctx.send(f"[X] Error retrieving server stats: {str(e)}")
+
+    @app_commands.command(name='stats', description="Check your or someone else's XP and level")
+    @app_commands.describe(member="Member to look up (defaults to you)")
+    async def stats_slash(self, interaction: discord.Interaction, member: discord.Member = None):
+        target = member or interaction.user
+        try:
+            await interaction.response.send_message(embed=build_stats_embed(target))
+        except Exception as e:
+            await interaction.response.send_message(f"[X] Error retrieving stats: {str(e)}", ephemeral=True)
+
+    @app_commands.command(name='leaderboard', description="Show the top members by XP")
+    @app_commands.describe(period="All time, this week or today")
+    @app_commands.choices(period=[app_commands.Choice(name=name, value=name) for name in PERIODS])
+    async def leaderboard_slash(self, interaction: discord.Interaction, period: str = 'all'):
+        try:
+            await interaction.response.send_message(embed=build_leaderboard_embed(period=period))
+        except Exception as e:
+            await interaction.response.send_message(f"[X] Error retrieving leaderboard: {str(e)}", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(XPCog(bot))
@@ -1,26 +1,156 @@
 
 import sqlite3
+import time
+
+DB_PATH = 'artifact_bot.db'
+
+# Activity buckets are UTC epoch hours / days / weeks (weeks start on Monday)
+HOURLY_RETENTION_HOURS = 14 * 24
+
+def current_hour(now=None):
+    return int((now if now is not None else time.time()) // 3600)
+
+def day_of_hour(hour):
+    return hour // 24
+
+def week_of_day(day):
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday
+    return (day + 3) // 7
+
 
 def init_db():
     """Initialize the database with user stats table"""
     try:
-        conn = sqlite3.connect('artifact_bot.db')
+        conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
+        # WAL lets online backups and exports read while XP writes continue
+        c.execute('PRAGMA journal_mode=WAL')
         c.execute('''CREATE TABLE IF NOT EXISTS users (
                         id TEXT PRIMARY KEY,
                         xp INTEGER DEFAULT 0,
                         level INTEGER DEFAULT 1
                     )''')
+        # Leaderboard reads walk this index instead of sorting the table
+        c.execute('CREATE INDEX IF NOT EXISTS idx_users_xp ON users (xp DESC)')
+        # Time-bucketed XP history: raw hourly buckets rolled up into days and weeks
+        for table, bucket in (('xp_hourly', 'hour'), ('xp_daily', 'day'), ('xp_weekly', 'week')):
+            c.execute(f'''CREATE TABLE IF NOT EXISTS {table} (
+                            user_id TEXT,
+                            {bucket} INTEGER,
+                            xp INTEGER DEFAULT 0,
+                            PRIMARY KEY (user_id, {bucket})
+                        ) WITHOUT ROWID''')
+            c.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{bucket} ON {table} ({bucket}, xp DESC)')
+        c.execute('''CREATE TABLE IF NOT EXISTS rollup_state (
+                        key TEXT PRIMARY KEY,
+                        value INTEGER
+                    )''')
+        _create_server_stats(c)
         conn.commit()
         conn.close()
         print("✅ Database initialized successfully")
     except Exception as e:
         print(f"❌ Database initialization error: {str(e)}")
 
+# Server-wide totals kept current by triggers, so stats never scan the users table
+SERVER_STATS_TRIGGERS = (
+    '''CREATE TRIGGER IF NOT EXISTS users_stats_insert AFTER INSERT ON users BEGIN
+           UPDATE server_stats SET user_count = user_count + 1, total_xp = total_xp + NEW.xp WHERE id = 1;
+           INSERT INTO level_counts (level, users) VALUES (NEW.level, 1)
+               ON CONFLICT (level) DO UPDATE SET users = users + 1;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS users_stats_xp AFTER UPDATE OF xp ON users
+       WHEN NEW.xp != OLD.xp BEGIN
+           UPDATE server_stats SET total_xp = total_xp + NEW.xp - OLD.xp WHERE id = 1;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS users_stats_level AFTER UPDATE OF level ON users
+       WHEN NEW.level != OLD.level BEGIN
+           UPDATE level_counts SET users = users - 1 WHERE level = OLD.level;
+           DELETE FROM level_counts WHERE level = OLD.level AND users <= 0;
+           INSERT INTO level_counts (level, users) VALUES (NEW.level, 1)
+               ON CONFLICT (level) DO UPDATE SET users = users + 1;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS users_stats_delete AFTER DELETE ON users BEGIN
+           UPDATE server_stats SET user_count = user_count - 1, total_xp = total_xp - OLD.xp WHERE id = 1;
+           UPDATE level_counts SET users = users - 1 WHERE level = OLD.level;
+           DELETE FROM level_counts WHERE level = OLD.level AND users <= 0;
+       END''',
+)
+
+def _create_server_stats(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS server_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    user_count INTEGER NOT NULL,
+                    total_xp INTEGER NOT NULL
+                )''')
+    # Users per level; MAX(level) is a primary key lookup
+    c.execute('''CREATE TABLE IF NOT EXISTS level_counts (
+                    level INTEGER PRIMARY KEY,
+                    users INTEGER NOT NULL
+                )''')
+    for trigger in SERVER_STATS_TRIGGERS:
+        c.execute(trigger)
+    if c.execute('SELECT 1 FROM server_stats WHERE id = 1').fetchone() is None:
+        # First run on an existing database: seed from one scan, in the same transaction as the triggers
+        _rebuild_server_stats(c)
+
+def _rebuild_server_stats(c):
+    c.execute('DELETE FROM server_stats')
+    c.execute('INSERT INTO server_stats (id, user_count, total_xp) SELECT 1, COUNT(*), COALESCE(SUM(xp), 0) FROM users')
+    c.execute('DELETE FROM level_counts')
+    c.execute('INSERT INTO level_counts (level, users) SELECT level, COUNT(*) FROM users GROUP BY level')
+
+def _read_server_stats(c):
+    row = c.execute('SELECT user_count, total_xp FROM server_stats WHERE id = 1').fetchone()
+    max_level = c.execute('SELECT MAX(level) FROM level_counts').fetchone()[0]
+    return (row[0], row[1], max_level or 0) if row else (0, 0, 0)
+
+def get_server_stats():
+    """Server-wide (user_count, total_xp, max_level) from the trigger-maintained summary"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        result = _read_server_stats(conn.cursor())
+        conn.close()
+        return result
+    except Exception as e:
+        print(f"❌ Error getting server stats: {str(e)}")
+        return (0, 0, 0)
+
+def reconcile_server_stats(fix=True):
+    """Check the summary tables against a full scan of users, rebuilding them on drift
+
+    Returns (ok, stored, actual) where stored/actual are (user_count, total_xp, max_level).
+    The comparison runs in a read transaction: under WAL that is one consistent
+    snapshot of users and the summary tables, and XP writes carry on during the
+    scan. The write lock is only taken when there is drift to rebuild.
+    """
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        c = conn.cursor()
+        c.execute('BEGIN')
+        stored = _read_server_stats(c)
+        stored_levels = dict(c.execute('SELECT level, users FROM level_counts'))
+        row = c.execute('SELECT COUNT(*), COALESCE(SUM(xp), 0), COALESCE(MAX(level), 0) FROM users').fetchone()
+        actual = tuple(row)
+        actual_levels = dict(c.execute('SELECT level, COUNT(*) FROM users GROUP BY level'))
+        c.execute('COMMIT')
+        ok = stored == actual and stored_levels == actual_levels
+        if not ok and fix:
+            c.execute('BEGIN IMMEDIATE')
+            try:
+                _rebuild_server_stats(c)
+                c.execute('COMMIT')
+            except Exception:
+                c.execute('ROLLBACK')
+                raise
+        return ok, stored, actual
+    finally:
+        conn.close()
+
 def add_xp(user_id, amount):
     """Add XP to a user and calculate their level"""
     try:
-        conn = sqlite3.connect('artifact_bot.db')
+        conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         
         # Insert user if they don't exist
@@ -34,6 +164,11 @@ def add_xp(user_id, amount):
         xp = c.fetchone()[0]
         new_level = max(1, xp // 100)
         c.execute('UPDATE users SET level = ? WHERE id = ?', (new_level, user_id))
+
+        # Record the XP in this hour's activity bucket
+        c.execute('''INSERT INTO xp_hourly (user_id, hour, xp) VALUES (?, ?, ?)
+                     ON CONFLICT (user_id, hour) DO UPDATE SET xp = xp + excluded.xp''',
+                  (user_id, current_hour(), amount))
         
         conn.commit()
         conn.close()
@@ -43,7 +178,7 @@ def add_xp(user_id, amount):
 def get_user_stats(user_id):
     """Get user's XP and level"""
     try:
-        conn = sqlite3.connect('artifact_bot.db')
+        conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         c.execute('SELECT xp, level FROM users WHERE id = ?', (user_id,))
         result = c.fetchone()
@@ -52,3 +187,103 @@ def get_user_stats(user_id):
     except Exception as e:
         print(f"❌ Error getting user stats: {str(e)}")
         return (0, 1)
+
+def get_leaderboard(limit=10):
+    """Get the top users by XP as (id, xp, level) rows"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('SELECT id, xp, level FROM users ORDER BY xp DESC LIMIT ?', (limit,))
+        result = c.fetchall()
+        conn.close()
+        return result
+    except Exception as e:
+        print(f"❌ Error getting leaderboard: {str(e)}")
+        return []
+
+def rollup_activity(now=None, retention_hours=HOURLY_RETENTION_HOURS):
+    """Fold closed hourly buckets into daily/weekly totals and prune old raw buckets
+
+    Only hours between the stored watermark and the current (still open) hour
+    are read, so each run costs O(new buckets) no matter how much history exists.
+    Returns the number of hourly buckets rolled up.
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('BEGIN IMMEDIATE')
+        row = c.execute("SELECT value FROM rollup_state WHERE key = 'hourly_watermark'").fetchone()
+        watermark = row[0] if row else (c.execute('SELECT MIN(hour) FROM xp_hourly').fetchone()[0] or 0)
+        end = current_hour(now)
+        rolled = c.execute('SELECT COUNT(*) FROM xp_hourly WHERE hour >= ? AND hour < ?',
+                           (watermark, end)).fetchone()[0]
+        if rolled:
+            c.execute('''INSERT INTO xp_daily (user_id, day, xp)
+                         SELECT user_id, hour / 24, SUM(xp) FROM xp_hourly
+                         WHERE hour >= ? AND hour < ? GROUP BY user_id, hour / 24
+                         ON CONFLICT (user_id, day) DO UPDATE SET xp = xp + excluded.xp''', (watermark, end))
+            c.execute('''INSERT INTO xp_weekly (user_id, week, xp)
+                         SELECT user_id, (hour / 24 + 3) / 7, SUM(xp) FROM xp_hourly
+                         WHERE hour >= ? AND hour < ? GROUP BY user_id, (hour / 24 + 3) / 7
+                         ON CONFLICT (user_id, week) DO UPDATE SET xp = xp + excluded.xp''', (watermark, end))
+        c.execute("INSERT OR REPLACE INTO rollup_state (key, value) VALUES ('hourly_watermark', ?)", (end,))
+        c.execute('DELETE FROM xp_hourly WHERE hour < ?', (end - max(0, retention_hours),))
+        conn.commit()
+        conn.close()
+        return rolled
+    except Exception as e:
+        print(f"❌ Error rolling up activity: {str(e)}")
+        return 0
+
+def _watermark(c):
+    row = c.execute("SELECT value FROM rollup_state WHERE key = 'hourly_watermark'").fetchone()
+    return row[0] if row else 0
+
+def get_period_leaderboard(period='week', limit=10, now=None):
+    """Top users by XP earned this week or today as (id, xp) rows
+
+    Combines the precomputed rollup for the period with the few hourly
+    buckets that haven't been rolled up yet.
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        hour = current_hour(now)
+        day = day_of_hour(hour)
+        if period == 'day':
+            table, column, bucket, start_hour = 'xp_daily', 'day', day, day * 24
+        else:
+            week = week_of_day(day)
+            table, column, bucket, start_hour = 'xp_weekly', 'week', week, (week * 7 - 3) * 24
+        pending_from = max(_watermark(c), start_hour)
+        c.execute(f'''SELECT user_id, SUM(xp) AS total FROM (
+                          SELECT user_id, xp FROM {table} WHERE {column} = ?
+                          UNION ALL
+                          SELECT user_id, xp FROM xp_hourly WHERE hour >= ?
+                      ) GROUP BY user_id ORDER BY total DESC LIMIT ?''', (bucket, pending_from, limit))
+        result = c.fetchall()
+        conn.close()
+        return result
+    except Exception as e:
+        print(f"❌ Error getting {period} leaderboard: {str(e)}")
+        return []
+
+def get_activity(user_id, days=7, now=None):
+    """XP per day for the last `days` days as a list of (day, xp), oldest first"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        hour = current_hour(now)
+        first_day = day_of_hour(hour) - days + 1
+        pending_from = max(_watermark(c), first_day * 24)
+        c.execute('''SELECT day, SUM(xp) FROM (
+                         SELECT day, xp FROM xp_daily WHERE user_id = ? AND day >= ?
+                         UNION ALL
+                         SELECT hour / 24 AS day, xp FROM xp_hourly WHERE user_id = ? AND hour >= ?
+                     ) GROUP BY day''', (user_id, first_day, user_id, pending_from))
+        totals = dict(c.fetchall())
+        conn.close()
+        return [(d, totals.get(d, 0)) for d in range(first_day, first_day + days)]
+    except Exception as e:
+        print(f"❌ Error getting activity: {str(e)}")
+        return []
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+XP Database Tools
+Streaming bulk export/import of the users table for backups and migrations,
+plus online backups and a consistency check of the server stats summary
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import db
+
+from backup import DEFAULT_PAGES_PER_STEP, DEFAULT_STEP_SLEEP, run_backup, verify_backup
+from db import DB_PATH
+
+EXPORT_BATCH_SIZE = 10000
+IMPORT_CHUNK_SIZE = 50000
+PROGRESS_INTERVAL = 1.0  # seconds between progress lines
+MAX_SKIPPED_SHOWN = 10  # bad import rows listed individually
+
+# Level is always derived from XP (100 XP per level, minimum level 1)
+MERGE_STRATEGIES = {
+    'replace': 'excluded.xp',
+    'max': 'MAX(users.xp, excluded.xp)',
+    'sum': 'users.xp + excluded.xp',
+}
+
+
+def detect_format(path, fmt=None):
+    """Pick csv or jsonl from an explicit format or the file extension"""
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    return 'csv'
+
+
+class Progress:
+    """Periodic row-count and throughput reporting on stderr"""
+
+    def __init__(self, label, quiet=False):
+        self.label = label
+        self.quiet = quiet
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.last_report = self.started
+
+    def update(self, count):
+        self.rows += count
+        now = time.perf_counter()
+        if not self.quiet and now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            elapsed = now - self.started
+            rate = self.rows / elapsed if elapsed > 0 else 0
+            print(f"  ⏳ {self.label}: {self.rows:,} rows ({rate:,.0f} rows/s)", file=sys.stderr)
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed > 0 else 0
+        if not self.quiet:
+            print(f"✅ {self.label}: {self.rows:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+        return self.rows, elapsed
+
+
+def iter_user_batches(db_path=DB_PATH, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of (id, xp, level) rows without loading the whole table"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute('SELECT id, xp, level FROM users ORDER BY rowid')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def export_users(out, fmt='csv', db_path=DB_PATH, batch_size=EXPORT_BATCH_SIZE, quiet=False):
+    """Stream the users table to a text file object as CSV or JSONL"""
+    progress = Progress('export', quiet)
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(('id', 'xp', 'level'))
+        for rows in iter_user_batches(db_path, batch_size):
+            writer.writerows(rows)
+            progress.update(len(rows))
+    elif fmt == 'jsonl':
+        dumps = json.dumps
+        for rows in iter_user_batches(db_path, batch_size):
+            out.write(''.join(
+                f'{{"id": {dumps(user_id)}, "xp": {xp}, "level": {level}}}\n'
+                for user_id, xp, level in rows
+            ))
+            progress.update(len(rows))
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return progress.finish()
+
+
+def _parse_row(record, id_field, xp_field):
+    user_id = record.get(id_field)
+    if user_id is None or str(user_id).strip() == '':
+        raise ValueError(f"missing {id_field!r}")
+    return str(user_id), int(float(record.get(xp_field) or 0))
+
+
+def iter_import_rows(src, fmt='csv', id_field='id', xp_field='xp', skipped=None):
+    """Yield (id, xp) tuples from a CSV or JSONL file object
+
+    Rows that cannot be parsed are skipped and recorded in `skipped` as
+    (line number, reason); without a `skipped` list the first one raises.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(src)
+        records = ((reader.line_num, record) for record in reader)
+    elif fmt == 'jsonl':
+        records = ((line_no, line) for line_no, line in enumerate(src, start=1) if line.strip())
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    for line_no, record in records:
+        try:
+            if fmt == 'jsonl':
+                record = json.loads(record)
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+            yield _parse_row(record, id_field, xp_field)
+        except (ValueError, TypeError, OverflowError) as e:
+            if skipped is None:
+                raise ValueError(f"line {line_no}: {e}") from e
+            skipped.append((line_no, str(e)))
+
+
+def import_users(src, fmt='csv', strategy='replace', db_path=DB_PATH,
+                 chunk_size=IMPORT_CHUNK_SIZE, id_field='id', xp_field='xp', quiet=False):
+    """Merge users from a CSV/JSONL file object in chunked executemany transactions
+
+    Bad rows are skipped rather than aborting halfway, since earlier chunks are
+    already committed and re-running a `sum` import would count them twice.
+    Returns (rows, elapsed, skipped) with skipped as (line number, reason) pairs.
+    """
+    if strategy not in MERGE_STRATEGIES:
+        raise ValueError(f"Unknown merge strategy: {strategy}")
+    xp_expr = MERGE_STRATEGIES[strategy]
+    sql = (
+        'INSERT INTO users (id, xp, level) VALUES (?, ?, MAX(1, ? / 100)) '
+        f'ON CONFLICT(id) DO UPDATE SET xp = {xp_expr}, level = MAX(1, ({xp_expr}) / 100)'
+    )
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute('PRAGMA synchronous = NORMAL')
+    progress = Progress(f'import ({strategy})', quiet)
+    chunk = []
+    skipped = []
+    try:
+        for user_id, xp in iter_import_rows(src, fmt, id_field, xp_field, skipped):
+            chunk.append((user_id, xp, xp))
+            if len(chunk) >= chunk_size:
+                _write_chunk(conn, sql, chunk)
+                progress.update(len(chunk))
+                chunk = []
+        if chunk:
+            _write_chunk(conn, sql, chunk)
+            progress.update(len(chunk))
+    finally:
+        conn.close()
+    rows, elapsed = progress.finish()
+    if skipped:
+        for line_no, reason in skipped[:MAX_SKIPPED_SHOWN]:
+            print(f"⚠️  line {line_no} skipped: {reason}", file=sys.stderr)
+        more = len(skipped) - MAX_SKIPPED_SHOWN
+        print(f"⚠️  {len(skipped):,} bad rows skipped" + (f" ({more:,} not shown)" if more > 0 else ""),
+              file=sys.stderr)
+    return rows, elapsed, skipped
+
+
+def _write_chunk(conn, sql, chunk):
+    """Apply one chunk atomically so the bot only waits for a single transaction"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.executemany(sql, chunk)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def cmd_export(args):
+    fmt = detect_format(args.file, args.format)
+    if args.file == '-':
+        export_users(sys.stdout, fmt, args.db, args.batch_size, args.quiet)
+    else:
+        with open(args.file, 'w', newline='', encoding='utf-8') as out:
+            export_users(out, fmt, args.db, args.batch_size, args.quiet)
+    return 0
+
+
+def cmd_import(args):
+    fmt = detect_format(args.file, args.format)
+    _ensure_schema(args.db)
+    if args.file == '-':
+        import_users(sys.stdin, fmt, args.strategy, args.db, args.chunk_size,
+                     args.id_field, args.xp_field, args.quiet)
+    else:
+        with open(args.file, newline='', encoding='utf-8') as src:
+            import_users(src, fmt, args.strategy, args.db, args.chunk_size,
+                         args.id_field, args.xp_field, args.quiet)
+    return 0
+
+
+def cmd_backup(args):
+    path, user_count, elapsed = run_backup(args.dir, args.keep, args.db, args.pages, args.step_sleep_ms / 1000)
+    if not args.quiet:
+        print(f"✅ Backup written to {path} ({user_count:,} users, {elapsed:.2f}s)", file=sys.stderr)
+    return 0
+
+
+def cmd_verify(args):
+    user_count = verify_backup(args.file)
+    if not args.quiet:
+        print(f"✅ {args.file} passed integrity check ({user_count:,} users)", file=sys.stderr)
+    return 0
+
+
+def cmd_reconcile(args):
+    # Creates the summary tables and triggers first if this database predates them
+    db.DB_PATH = args.db
+    db.init_db()
+    ok, stored, actual = db.reconcile_server_stats(fix=not args.check)
+    if ok:
+        print(f"✅ Server stats match the users table ({actual[0]:,} users, {actual[1]:,} XP, "
+              f"max level {actual[2]})", file=sys.stderr)
+        return 0
+    action = "left as is (--check)" if args.check else "rebuilt"
+    print(f"⚠️  Server stats drifted: stored {stored}, actual {actual}; {action}", file=sys.stderr)
+    return 1 if args.check else 0
+
+
+def _ensure_schema(db_path):
+    """Create the users table when importing into a fresh database"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE IF NOT EXISTS users (
+                        id TEXT PRIMARY KEY,
+                        xp INTEGER DEFAULT 0,
+                        level INTEGER DEFAULT 1
+                    )''')
+    conn.commit()
+    conn.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Artifact Discord Bot XP database tools")
+    parser.add_argument('--db', default=DB_PATH, help=f"SQLite database path (default: {DB_PATH})")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Suppress progress output")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help="Stream the users table to CSV or JSONL")
+    export.add_argument('file', help="Output file, or - for stdout")
+    export.add_argument('--format', choices=('csv', 'jsonl'), help="Defaults to the file extension")
+    export.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE)
+    export.set_defaults(func=cmd_export)
+
+    imp = sub.add_parser('import', help="Merge users from a CSV or JSONL export")
+    imp.add_argument('file', help="Input file, or - for stdin")
+    imp.add_argument('--format', choices=('csv', 'jsonl'), help="Defaults to the file extension")
+    imp.add_argument('--strategy', choices=sorted(MERGE_STRATEGIES), default='replace',
+                     help="How to merge XP for users that already exist")
+    imp.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+    imp.add_argument('--id-field', default='id', help="Source column holding the Discord user ID")
+    imp.add_argument('--xp-field', default='xp', help="Source column holding the XP value")
+    imp.set_defaults(func=cmd_import)
+
+    bak = sub.add_parser('backup', help="Take a verified online backup while the bot is running")
+    bak.add_argument('--dir', default='backups', help="Backup directory (default: backups)")
+    bak.add_argument('--keep', type=int, default=7, help="Number of backups to retain")
+    bak.add_argument('--pages', type=int, default=DEFAULT_PAGES_PER_STEP, help="Pages copied per step")
+    bak.add_argument('--step-sleep-ms', type=float, default=DEFAULT_STEP_SLEEP * 1000,
+                     help="Pause between steps so the bot can write")
+    bak.set_defaults(func=cmd_backup)
+
+    verify = sub.add_parser('verify', help="Run an integrity check on a backup file")
+    verify.add_argument('file')
+    verify.set_defaults(func=cmd_verify)
+
+    rec = sub.add_parser('reconcile', help="Compare the server stats summary with a full scan and fix drift")
+    rec.add_argument('--check', action='store_true', help="Only report drift (exit 1) without fixing it")
+    rec.set_defaults(func=cmd_reconcile)
+
+    return parser
+
+
+def main(argv=None):
+    """Entry point"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"❌ {args.command} failed: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+In-flight !ask generations
+Tracks the running generation task for each user and triggering message so a
+deleted message, !cancel, or a newer question can abort it and free the model slot
+"""
+
+import asyncio
+import logging
+
+
+class InflightRegistry:
+    """At most one running generation per user, also indexed by the message that asked"""
+
+    def __init__(self):
+        self.by_user = {}
+        self.by_message = {}
+        self.cancelled = 0
+
+    def __len__(self):
+        return len(self.by_user)
+
+    def start(self, user_id, coro, message_id=None):
+        """Run coro as the user's current generation, cancelling the one it supersedes"""
+        self.cancel_user(user_id, reason="superseded by a newer question")
+        task = asyncio.get_event_loop().create_task(coro)
+        self.by_user[user_id] = task
+        if message_id is not None:
+            self.by_message[message_id] = task
+        task.add_done_callback(lambda t: self._forget(user_id, message_id, t))
+        return task
+
+    def _forget(self, user_id, message_id, task):
+        if self.by_user.get(user_id) is task:
+            del self.by_user[user_id]
+        if message_id is not None and self.by_message.get(message_id) is task:
+            del self.by_message[message_id]
+
+    def _cancel(self, task, reason):
+        if task is None or task.done():
+            return False
+        task.cancel()
+        self.cancelled += 1
+        logging.info(f"ask: generation cancelled ({reason})")
+        return True
+
+    def cancel_user(self, user_id, reason="cancelled by user"):
+        return self._cancel(self.by_user.get(user_id), reason)
+
+    def cancel_message(self, message_id, reason="triggering message deleted"):
+        return self._cancel(self.by_message.get(message_id), reason)
+
+    def cancel_all(self):
+        for task in list(self.by_user.values()):
+            self._cancel(task, "bot shutting down")
+
+
+async def run_cancellable(task):
+    """Wait for a registered generation; returns (result, cancelled)
+
+    Waiting with asyncio.wait keeps a cancel of the generation task from being
+    mistaken for a cancel of the command that awaits it.
+    """
+    await asyncio.wait({task})
+    if task.cancelled():
+        return None, True
+    return task.result(), False
@@ -4,19 +4,30 @@ Artifact Discord Bot Manager
 Manages both Python bot and C++ Discord SDK components
 """
 
+import asyncio
 import os
 import sys
-import subprocess
-import time
 import signal
 import threading
 from pathlib import Path
 
+from logmux import READ_LIMIT, LogMultiplexer
+
+CONSOLE_HELP = """Console commands:
+  tail <bot|sdk> [N]   show the last N lines (default 20)
+  dump <bot|sdk> [N]   write the last N lines (default: whole buffer) to a file
+  stats                lines seen per component
+  help                 show this help"""
+
 class DiscordBotManager:
     def __init__(self):
         self.bot_process = None
         self.sdk_process = None
         self.running = True
+        self.logs = LogMultiplexer()
+        self.pumps = []
+        self.loop = None
+        self.stop_event = None
         
         # Set up signal handlers
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -25,8 +36,11 @@ class DiscordBotManager:
     def signal_handler(self, signum, frame):
         print(f"\n🛑 Received signal {signum}, shutting down...")
         self.running = False
-        self.cleanup()
-        sys.exit(0)
+        if self.loop is not None:
+            # Runs on the loop's thread; cleanup happens when run_async unwinds
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        else:
+            sys.exit(0)
         
     def check_requirements(self):
         """Check if all requirements are met"""
@@ -60,28 +74,24 @@ class DiscordBotManager:
         print("✅ C++ Discord SDK available")
         return True
         
-    def start_python_bot(self):
+    async def spawn(self, name, args):
+        """Start a child with its output pumped through the log multiplexer"""
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=READ_LIMIT,
+            env=dict(os.environ, PYTHONUNBUFFERED="1"),
+        )
+        self.logs.add(name)
+        self.pumps.append(asyncio.ensure_future(self.logs.pump(name, process.stdout)))
+        return process
+
+    async def start_python_bot(self):
         """Start the Python Discord bot"""
         print("🐍 Starting Python Discord bot...")
         try:
-            self.bot_process = subprocess.Popen(
-                [sys.executable, "bot.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Monitor bot output in a separate thread
-            def monitor_bot():
-                for line in iter(self.bot_process.stdout.readline, ''):
-                    if line:
-                        print(f"[Bot] {line.strip()}")
-                        
-            monitor_thread = threading.Thread(target=monitor_bot, daemon=True)
-            monitor_thread.start()
-            
+            self.bot_process = await self.spawn("Bot", [sys.executable, "bot.py"])
             print("✅ Python bot started")
             return True
             
@@ -89,7 +99,7 @@ class DiscordBotManager:
             print(f"❌ Failed to start Python bot: {e}")
             return False
             
-    def start_cpp_sdk(self):
+    async def start_cpp_sdk(self):
         """Start the C++ Discord SDK"""
         sdk_path = Path("build/Release/discord_sdk.exe")
         if not sdk_path.exists():
@@ -98,24 +108,7 @@ class DiscordBotManager:
             
         print("⚙️  Starting C++ Discord SDK...")
         try:
-            self.sdk_process = subprocess.Popen(
-                [str(sdk_path)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Monitor SDK output in a separate thread
-            def monitor_sdk():
-                for line in iter(self.sdk_process.stdout.readline, ''):
-                    if line:
-                        print(f"[SDK] {line.strip()}")
-                        
-            monitor_thread = threading.Thread(target=monitor_sdk, daemon=True)
-            monitor_thread.start()
-            
+            self.sdk_process = await self.spawn("SDK", [str(sdk_path)])
             print("✅ C++ SDK started")
             return True
             
@@ -123,36 +116,76 @@ class DiscordBotManager:
             print(f"❌ Failed to start C++ SDK: {e}")
             return False
             
-    def cleanup(self):
+    async def stop_process(self, process, label):
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), timeout=5)
+            print(f"✅ {label} stopped")
+        except asyncio.TimeoutError:
+            process.kill()
+            print(f"🔄 {label} force-stopped")
+        except Exception as e:
+            print(f"⚠️  Error stopping {label}: {e}")
+
+    async def cleanup(self):
         """Clean up all processes"""
         print("🧹 Cleaning up processes...")
-        
-        if self.bot_process:
-            try:
-                self.bot_process.terminate()
-                self.bot_process.wait(timeout=5)
-                print("✅ Python bot stopped")
-            except subprocess.TimeoutExpired:
-                self.bot_process.kill()
-                print("🔄 Python bot force-stopped")
-            except Exception as e:
-                print(f"⚠️  Error stopping Python bot: {e}")
-                
-        if self.sdk_process:
-            try:
-                self.sdk_process.terminate()
-                self.sdk_process.wait(timeout=5)
-                print("✅ C++ SDK stopped")
-            except subprocess.TimeoutExpired:
-                self.sdk_process.kill()
-                print("🔄 C++ SDK force-stopped")
-            except Exception as e:
-                print(f"⚠️  Error stopping C++ SDK: {e}")
-                
-    def run(self):
+        await self.stop_process(self.bot_process, "Python bot")
+        await self.stop_process(self.sdk_process, "C++ SDK")
+        # Let the pumps drain whatever the children printed on the way out
+        if self.pumps:
+            await asyncio.wait(self.pumps, timeout=2)
+        self.logs.close()
+
+    def handle_command(self, line):
+        """Run one console command against the buffered child output"""
+        parts = line.split()
+        if not parts:
+            return
+        command, args = parts[0].lower(), parts[1:]
+        if command == "stats":
+            for name, info in self.logs.stats().items():
+                print(f"📊 {name}: {info['lines']} lines, {info['buffered']} buffered, log {info['file']}")
+            return
+        if command not in ("tail", "dump") or not args:
+            print(CONSOLE_HELP)
+            return
+        if self.logs.get(args[0]) is None:
+            print(f"❓ Unknown component '{args[0]}' (known: {', '.join(self.logs.children) or 'none'})")
+            return
+        try:
+            count = int(args[1]) if len(args) > 1 else None
+        except ValueError:
+            print(CONSOLE_HELP)
+            return
+        if command == "tail":
+            print(f"----- last lines of {args[0]} -----")
+            for buffered in self.logs.get(args[0]).tail(count or 20):
+                print(buffered)
+            print("-" * 30)
+        else:
+            print(f"💾 Wrote {self.logs.dump(args[0], count)}")
+
+    def start_console(self):
+        """Read console commands on a daemon thread (stdin can't be awaited on Windows)"""
+        def reader():
+            for line in sys.stdin:
+                try:
+                    self.loop.call_soon_threadsafe(self.handle_command, line)
+                except RuntimeError:
+                    return  # loop already closed
+            # stdin closed (e.g. running detached): children keep logging to files
+
+        threading.Thread(target=reader, daemon=True).start()
+
+    async def run_async(self):
         """Main run loop"""
         print("🚀 Artifact Discord Bot Manager")
         print("=" * 40)
+        self.loop = asyncio.get_event_loop()
+        self.stop_event = asyncio.Event()
         
         # Check requirements
         req_status = self.check_requirements()
@@ -163,12 +196,12 @@ class DiscordBotManager:
         success = False
         
         # Always try to start Python bot
-        if self.start_python_bot():
+        if await self.start_python_bot():
             success = True
             
         # Start C++ SDK if available
         if req_status is True:  # Full requirements met
-            self.start_cpp_sdk()
+            await self.start_cpp_sdk()
             
         if not success:
             print("❌ Failed to start any components")
@@ -178,33 +211,44 @@ class DiscordBotManager:
         print("📱 Python bot handles Discord commands and XP system")
         if req_status is True:
             print("🎮 C++ SDK provides rich presence and advanced features")
+        print(f"📝 Component output is logged to {self.logs.log_dir}/ (type 'help' for console commands)")
         print("🛑 Press Ctrl+C to stop all components")
         print("-" * 50)
         
+        self.start_console()
         # Keep running until interrupted
         try:
             while self.running:
                 # Check if processes are still alive
-                if self.bot_process and self.bot_process.poll() is not None:
+                if self.bot_process and self.bot_process.returncode is not None:
                     print("⚠️  Python bot process ended unexpectedly")
                     break
                     
-                if self.sdk_process and self.sdk_process.poll() is not None:
+                if self.sdk_process and self.sdk_process.returncode is not None:
                     print("⚠️  C++ SDK process ended unexpectedly")
                     # SDK ending is not critical, continue with just Python bot
                     self.sdk_process = None
                     
-                time.sleep(1)
+                self.logs.tick()
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), timeout=1)
+                except asyncio.TimeoutError:
+                    pass
                 
-        except KeyboardInterrupt:
-            print("\n🛑 Received Ctrl+C, shutting down...")
-            
         finally:
-            self.cleanup()
+            self.running = False
+            await self.cleanup()
             
         print("👋 All components stopped. Goodbye!")
         return 0
 
+    def run(self):
+        try:
+            return asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            print("\n🛑 Received Ctrl+C, shutting down...")
+            return 0
+
 def main():
     """Entry point"""
     os.chdir(Path(__file__).parent)  # Change to script directory
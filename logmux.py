@@ -0,0 +1,169 @@
+"""
+Child process log multiplexer for launcher.py
+Reads every child's output on one event loop. Each child gets a bounded ring buffer
+for on-demand tail/dump and a rotating log file. Terminal echo is rate-limited, and
+repeated lines are collapsed into a summary.
+"""
+
+import logging
+import os
+import sys
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+READ_LIMIT = 1 << 20  # longest line read from a child before it is cut
+
+
+class RateLimit:
+    """Token bucket: `rate` lines per second with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def allow(self):
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ChildLog:
+    """Output of one child: ring buffer, rotating file and rate-limited terminal echo"""
+
+    def __init__(self, name, ring_lines, log_dir, max_bytes, backups, rate, burst, echo):
+        self.name = name
+        self.ring = deque(maxlen=ring_lines)
+        self.limit = RateLimit(rate, burst)
+        self.echo = echo
+        self.last_line = None
+        self.repeats = 0
+        self.suppressed = 0
+        self.total = 0
+
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(log_dir) / f"{name.lower()}.log"
+        self.logger = logging.getLogger(f"launcher.{name}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        self.logger.addHandler(handler)
+
+    def feed(self, line):
+        """Take one line of child output"""
+        self.total += 1
+        if line == self.last_line:
+            self.repeats += 1
+            return
+        self._flush_repeats()
+        self.last_line = line
+        self._record(line)
+
+    def tick(self):
+        """Emit pending summaries; called about once a second"""
+        self._flush_repeats()
+        if self.suppressed:
+            self._write(f"... {self.suppressed} lines not shown (rate limit); "
+                        f"type 'tail {self.name.lower()}' or see {self.path}")
+            self.suppressed = 0
+
+    def close(self):
+        self.tick()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+
+    def tail(self, count):
+        return list(self.ring)[-count:] if count > 0 else []
+
+    def _flush_repeats(self):
+        if self.repeats:
+            self._record(f"(previous line repeated {self.repeats} more times)")
+            self.repeats = 0
+
+    def _record(self, line):
+        self.ring.append(f"{time.strftime('%H:%M:%S')} {line}")
+        self.logger.info(line)
+        if self.limit.allow():
+            self._write(line)
+        else:
+            self.suppressed += 1
+
+    def _write(self, line):
+        if not self.echo:
+            return
+        try:
+            sys.stdout.write(f"[{self.name}] {line}\n")
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            # Terminal closed: keep logging to the ring and the files only
+            self.echo = False
+
+
+class LogMultiplexer:
+    """Pumps the output of several children from one event loop"""
+
+    def __init__(self, ring_lines=None, log_dir=None, max_bytes=None, backups=None, rate=None, burst=None):
+        self.ring_lines = int(ring_lines or os.getenv('LAUNCHER_RING_LINES', '2000'))
+        self.log_dir = log_dir or os.getenv('LAUNCHER_LOG_DIR', 'logs')
+        self.max_bytes = int(max_bytes or os.getenv('LAUNCHER_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+        self.backups = int(backups or os.getenv('LAUNCHER_LOG_BACKUPS', '5'))
+        self.rate = float(rate if rate is not None else os.getenv('LAUNCHER_ECHO_RATE', '20'))
+        self.burst = float(burst or os.getenv('LAUNCHER_ECHO_BURST', '50'))
+        self.children = {}
+
+    def add(self, name):
+        child = ChildLog(name, self.ring_lines, self.log_dir, self.max_bytes, self.backups,
+                         self.rate, self.burst, echo=True)
+        self.children[name.lower()] = child
+        return child
+
+    def get(self, name):
+        return self.children.get(name.lower())
+
+    async def pump(self, name, stream):
+        """Read a child's stdout until EOF"""
+        child = self.get(name) or self.add(name)
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                child.feed(f"(line longer than {READ_LIMIT} bytes dropped)")
+                continue
+            if not line:
+                break
+            child.feed(line.decode('utf-8', errors='replace').rstrip())
+        child.tick()
+
+    def tick(self):
+        for child in self.children.values():
+            child.tick()
+
+    def close(self):
+        for child in self.children.values():
+            child.close()
+
+    def dump(self, name, count=None, path=None):
+        """Write a child's last `count` buffered lines (all by default) to a file; returns the path"""
+        child = self.get(name)
+        lines = child.tail(count) if count else list(child.ring)
+        path = Path(path or Path(self.log_dir) / f"{name.lower()}-dump-{time.strftime('%Y%m%d-%H%M%S')}.log")
+        path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+        return path
+
+    def stats(self):
+        return {name: {'lines': child.total, 'buffered': len(child.ring), 'file': str(child.path)}
+                for name, child in self.children.items()}
@@ -0,0 +1,333 @@
+"""
+Moderation pre-filter
+Every message is checked against one compiled pattern built from a hot-reloaded
+blocklist file, allowing for common obfuscations (accents and lookalikes,
+leetspeak, s.p.a.c.e.d and s p a c e d letters, repeated letters). Only messages that match go
+on to the optional LLM review in a bounded background queue.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import unicodedata
+
+from budgets import Budget
+
+# Leetspeak substitutions; terms in the blocklist are stored with these undone
+LEET_FROM, LEET_TO = '01345789@$!|+', 'oieastbgasiit'
+LEET = str.maketrans(LEET_FROM, LEET_TO)
+# Most messages are ASCII: undo leetspeak for raw `re:` patterns in one bytes.translate
+ASCII_LEET = bytes.maketrans(LEET_FROM.encode(), LEET_TO.encode())
+
+# Before matching terms, messages are folded in one translate pass:
+#  - digits become their letters ("1d10t" -> "idiot"); they are word characters,
+#    so word boundaries don't move
+#  - leet symbols become uppercase placeholders ("sh!t" -> "shIt") that the pattern
+#    accepts in place of the letter but word boundaries ignore, so "idiot!" still
+#    ends on one
+#  - other punctuation and "_" become "." so "f.u.c.k" and "f_u_c_k" read alike;
+#    whitespace and apostrophes are kept, so "he'll" and "as s" are not joined up
+LEET_SYMBOLS = ''.join(symbol for symbol in LEET_FROM if not symbol.isalnum())
+_FOLD_TO_LEET = ''.join(to if symbol.isalnum() else to.upper() for symbol, to in zip(LEET_FROM, LEET_TO))
+PLACEHOLDERS = ''.join(sorted(set(_FOLD_TO_LEET) - set(LEET_TO)))
+_PUNCTUATION = ''.join(ch for ch in map(chr, range(33, 127))
+                       if not ch.isalnum() and ch not in LEET_SYMBOLS and ch != "'")
+FOLD = str.maketrans(LEET_FROM + _PUNCTUATION, _FOLD_TO_LEET + '.' * len(_PUNCTUATION))
+ASCII_FOLD = bytes.maketrans((LEET_FROM + _PUNCTUATION).encode(), (_FOLD_TO_LEET + '.' * len(_PUNCTUATION)).encode())
+# For showing what matched: the first symbol for each placeholder, 'I' -> '!'
+UNFOLD = {ord(to.upper()): symbol for symbol, to in reversed(list(zip(LEET_FROM, LEET_TO))) if symbol in LEET_SYMBOLS}
+# Each letter with the placeholder that may stand in for it, e.g. 'i' -> 'iI'
+LETTER_FORMS = {letter: letter + letter.upper() for letter in PLACEHOLDERS.lower()}
+
+SEPARATORS_RE = re.compile(r'[\W_]+')
+COMBINING_RE = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+# Allowed between the letters of a term ("f.u.c.k"). No letter form is a separator,
+# so a run of "!!!!" can only be read one way and matching stays linear on hostile input
+SEPARATOR, SEPARATOR_REQUIRED = r'\.*', r'\.+'
+# A doubled letter may be split at most this many times ("a.s.s"). Unbounded, "s.s.s..."
+# would give every "s" a match attempt running to the end of the message
+MAX_SPLIT_REPEATS = 4
+# Spelled out with spaces ("f u c k"): three or more single characters, joined before matching
+_SPACED_CHAR = r'[\w' + re.escape(LEET_SYMBOLS) + ']'
+SPACED_RE = re.compile(rf'(?<!{_SPACED_CHAR}){_SPACED_CHAR}(?:[ \t]+{_SPACED_CHAR}){{2,}}(?!\w)')
+WHITESPACE_RE = re.compile(r'\s+')
+# Word boundaries that treat placeholders as punctuation ("$hit", "idiot!")
+TERM_START, TERM_END = rf'(?<![^\W{PLACEHOLDERS}])', rf'(?![^\W{PLACEHOLDERS}])'
+REVIEW_PROMPT = (
+    "Moderation check. Reply with only YES if the message below breaks community guidelines "
+    "(harassment, hate speech, slurs, threats, sexual content, spam scams), otherwise reply NO.\n\n"
+    "Message: {content}"
+)
+REVIEW_BUDGET = Budget(input_tokens=256, output_tokens=3, timeout=15)
+
+
+def normalize(text):
+    """Casefolded text with accents and lookalike characters undone; punctuation is kept"""
+    if text.isascii():
+        return text.lower()
+    # NFKD turns fullwidth/styled letters into plain ones and splits off accents
+    return COMBINING_RE.sub('', unicodedata.normalize('NFKD', text)).casefold()
+
+
+def join_spaced(text):
+    """Normalized text with letters spelled out with spaces ("f u c k") joined up"""
+    return SPACED_RE.sub(lambda match: WHITESPACE_RE.sub('', match.group()), text)
+
+
+def fold(text):
+    """Normalized text prepared for the term pattern (see FOLD above)"""
+    text = join_spaced(text)
+    if text.isascii():
+        return text.encode('ascii').translate(ASCII_FOLD).decode('ascii')
+    return text.translate(FOLD)
+
+
+def fold_leet(text):
+    """Normalized text with leetspeak digits and symbols turned into letters"""
+    if text.isascii():
+        return text.encode('ascii').translate(ASCII_LEET).decode('ascii')
+    return text.translate(LEET)
+
+
+WORD_END, PREFIX_END = '', '*'  # trie markers; neither survives term normalization
+
+
+def _runs(term):
+    """Split a term into (letter, repeated) runs: 'ass' -> [('a', False), ('s', True)]"""
+    runs = []
+    for ch in term:
+        if runs and runs[-1][0] == ch:
+            runs[-1] = (ch, True)
+        else:
+            runs.append((ch, False))
+    return runs
+
+
+def _trie_pattern(words, prefixes):
+    """One regex for all terms, shaped like a trie so shared prefixes are matched once
+
+    Whole-word terms must end at a word boundary; prefix terms may run on. Every
+    letter may be written as its leetspeak forms ("sh!t"), repeat ("fuuuck") and
+    be followed by separators ("f.u.c.k"). Adjacent tokens never share a
+    character, so there is only one way to match any text and a search costs
+    time linear in the message, however hostile.
+    """
+    trie = {}
+    for terms, marker in ((words, WORD_END), (prefixes, PREFIX_END)):
+        for term in terms:
+            node = trie
+            for run in _runs(term):
+                node = node.setdefault(run, {})
+            node[marker] = {}
+
+    def run_pattern(run, first):
+        ch, repeated = run
+        forms = LETTER_FORMS.get(ch, ch)
+        letter = f'[{forms}]' if len(forms) > 1 else re.escape(ch)
+        # A term may only start where a run of its first letter starts ("!!!!" is tried once,
+        # not n times). TERM_START already rules out a letter before it, leaving the placeholder
+        start = f'(?<!{ch.upper()})' if first and len(forms) > 1 else ''
+        if repeated:
+            # Doubled letters ("ass") need at least two, either together or separated ("a.s.s")
+            return f'{start}(?:{letter}{{2,}}|{letter}+(?:{SEPARATOR_REQUIRED}{letter}+){{1,{MAX_SPLIT_REPEATS}}})'
+        return f'{start}{letter}+'
+
+    def emit(node, first=False):
+        alternatives = [('' if first else SEPARATOR) + run_pattern(run, first) + emit(child)
+                        for run, child in sorted(node.items(), key=str) if run not in (WORD_END, PREFIX_END)]
+        if WORD_END in node:
+            alternatives.append(TERM_END)
+        if PREFIX_END in node:
+            alternatives.append('')
+        return alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+
+    return TERM_START + emit(trie, first=True)
+
+
+def compile_blocklist(lines):
+    """Compile blocklist lines into (term_pattern, raw_pattern), each None if there are no such entries
+
+    Plain terms match whole words; `term*` also matches words starting with the
+    term. Both are searched in fold(normalize(text)). `re:<regex>` lines are used
+    as-is against fold_leet(normalize(text)).
+    """
+    words, prefixes, raw = set(), set(), []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('re:'):
+            raw.append(line[3:])
+        elif line.endswith('*'):
+            prefixes.add(SEPARATORS_RE.sub('', fold_leet(normalize(line[:-1]))))
+        else:
+            words.add(SEPARATORS_RE.sub('', fold_leet(normalize(line))))
+    words.discard('')
+    prefixes.discard('')
+    terms = re.compile(_trie_pattern(words, prefixes)) if words or prefixes else None
+    raw_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in raw)) if raw else None
+    return terms, raw_pattern
+
+
+class Moderator:
+    """Blocklist pre-filter plus a bounded queue of messages waiting for review/action"""
+
+    def __init__(self, path, action='flag', log_channel_id=None, llm_review=False,
+                 queue_size=100, reload_seconds=5.0):
+        self.path = path
+        self.action = action
+        self.log_channel_id = log_channel_id
+        self.llm_review = llm_review
+        self.reload_seconds = reload_seconds
+        self.pattern = None
+        self.raw_pattern = None
+        self.terms = 0
+        self.mtime = None
+        self.next_reload_check = 0.0
+        self.queue_size = queue_size
+        self.queue = None
+        self.task = None
+        self.counts = {'checked': 0, 'matched': 0, 'dropped': 0, 'reviewed': 0, 'confirmed': 0}
+        self.reload()
+
+    @classmethod
+    def from_env(cls):
+        """Build from MODERATION_* settings, or None if moderation is turned off"""
+        if os.getenv('MODERATION', 'true').lower() in ('0', 'false', 'no', 'off'):
+            return None
+        channel = os.getenv('MODERATION_LOG_CHANNEL')
+        return cls(
+            os.getenv('MODERATION_BLOCKLIST', 'blocklist.txt'),
+            action=os.getenv('MODERATION_ACTION', 'flag').lower(),
+            log_channel_id=int(channel) if channel else None,
+            llm_review=os.getenv('MODERATION_LLM_REVIEW', 'false').lower() in ('1', 'true', 'yes', 'on'),
+            queue_size=int(os.getenv('MODERATION_QUEUE_SIZE', '100')),
+            reload_seconds=float(os.getenv('MODERATION_RELOAD_SECONDS', '5')),
+        )
+
+    def reload(self):
+        """Recompile the blocklist if the file changed; returns True if it was (re)loaded"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            if self.pattern is not None or self.raw_pattern is not None:
+                logging.warning(f"Moderation blocklist {self.path} is gone; filter disabled")
+            self.pattern, self.raw_pattern, self.terms, self.mtime = None, None, 0, None
+            return False
+        if mtime == self.mtime:
+            return False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            pattern, raw_pattern = compile_blocklist(lines)
+        except (OSError, re.error) as e:
+            # Keep the last good pattern rather than dropping moderation on a typo
+            logging.error(f"Moderation blocklist {self.path} not reloaded: {e}")
+            self.mtime = mtime
+            return False
+        self.pattern, self.raw_pattern, self.mtime = pattern, raw_pattern, mtime
+        self.terms = sum(1 for line in lines if line.strip() and not line.strip().startswith('#'))
+        logging.info(f"Moderation blocklist loaded: {self.terms} entries")
+        return True
+
+    def check(self, content):
+        """The matched text if content hits the blocklist, else None"""
+        now = time.monotonic()
+        if now >= self.next_reload_check:
+            self.next_reload_check = now + self.reload_seconds
+            self.reload()
+        self.counts['checked'] += 1
+        if not content or (self.pattern is None and self.raw_pattern is None):
+            return None
+        text = normalize(content)
+        match = self.pattern.search(fold(text)) if self.pattern is not None else None
+        if match is None and self.raw_pattern is not None:
+            match = self.raw_pattern.search(fold_leet(text))
+        if match is None:
+            return None
+        self.counts['matched'] += 1
+        return match.group().translate(UNFOLD)
+
+    def submit(self, message, matched):
+        """Queue a matched message for review/action; drops it if the queue is full"""
+        if self.queue is None:
+            return False
+        try:
+            self.queue.put_nowait((message, matched))
+            return True
+        except asyncio.QueueFull:
+            self.counts['dropped'] += 1
+            logging.warning(f"Moderation queue full; skipped message {message.id}")
+            return False
+
+    def start(self, bot):
+        """Start the single review worker once"""
+        if not bot.intents.message_content:
+            logging.warning("Moderation is on but MESSAGE_CONTENT_INTENT=false: guild messages arrive "
+                            "without content, so the blocklist filter will not match anything")
+        if self.task is None:
+            # Created here so the queue belongs to the running loop
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self.task = asyncio.get_event_loop().create_task(self._worker(bot))
+        return self.task
+
+    async def _worker(self, bot):
+        while True:
+            message, matched = await self.queue.get()
+            try:
+                verdict = "blocklist match"
+                if self.llm_review:
+                    confirmed = await self._review(bot, message.content)
+                    self.counts['reviewed'] += 1
+                    if not confirmed:
+                        continue
+                    verdict = "blocklist match confirmed by review"
+                self.counts['confirmed'] += 1
+                await self._act(bot, message, matched, verdict)
+            except Exception as e:
+                logging.error(f"Moderation of message {message.id} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _review(self, bot, content):
+        """Ask the fast model whether the message breaks the guidelines"""
+        from ollama_client import ask_ollama_async
+
+        model = bot.router.fast
+        bot.router.begin(model)
+        result = None
+        try:
+            result = await ask_ollama_async(REVIEW_PROMPT.format(content=content), REVIEW_BUDGET, model,
+                                            session=bot.ollama_session)
+        finally:
+            bot.router.finish(model, result.elapsed if result else None, ok=result is not None and not result.error)
+        if result.error:
+            # Without a verdict, err on the side of a human looking at it
+            return True
+        return result.text.strip().upper().startswith('YES')
+
+    async def _act(self, bot, message, matched, verdict):
+        import discord
+
+        logging.info(f"Moderation: message {message.id} by {message.author.id} flagged ({verdict}: {matched!r})")
+        deleted = False
+        if self.action == 'delete':
+            try:
+                await message.delete()
+                deleted = True
+            except discord.HTTPException as e:
+                logging.error(f"Moderation could not delete message {message.id}: {e}")
+        channel = bot.get_channel(self.log_channel_id) if self.log_channel_id else None
+        if channel is not None:
+            where = getattr(message.channel, 'mention', 'a DM')
+            # The quoted message may contain @everyone or role mentions; the report must not ping anyone
+            await bot.outbound.send(channel, (
+                f"[MOD] {message.author.mention} in {where} ({verdict}, matched `{matched}`)"
+                f"{' - deleted' if deleted else ''}\n> {message.content[:500]}"
+            ), allowed_mentions=discord.AllowedMentions.none())
+
+    def stats(self):
+        return dict(self.counts, terms=self.terms, queued=self.queue.qsize() if self.queue else 0,
+                    review=self.llm_review, action=self.action)
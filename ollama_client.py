@@ -1,11 +1,27 @@
-import requests
+import asyncio
+import json
 import os
-from dotenv import load_dotenv
+import re
+import time
+from dataclasses import dataclass
 
-load_dotenv()
+from budgets import default_budget
 
-OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434/api/generate')
-OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama2')
+# Settings are read from the environment on use rather than at import, so
+# importing this module has no side effects and sees .env once an entry point
+# has loaded it.
+
+def ollama_url():
+    return os.getenv('OLLAMA_URL', 'http://localhost:11434/api/generate')
+
+def ollama_model():
+    return os.getenv('OLLAMA_MODEL', 'llama2')
+
+def ollama_embed_model():
+    return os.getenv('OLLAMA_EMBED_MODEL', 'nomic-embed-text')
+
+def ollama_embed_url():
+    return os.getenv('OLLAMA_EMBED_URL', ollama_url().rsplit('/api/', 1)[0] + '/api/embeddings')
 
 # --- System prompt for Arty, the Artifact Virtual Assistant ---
 SYSTEM_PROMPT = (
@@ -17,24 +33,141 @@ SYSTEM_PROMPT = (
     "You are always helpful, never rude, and you never break character."
 )
 
-def ask_ollama(prompt):
+# Rough BPE approximation: words cost one token per ~4 characters, punctuation one each
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+# Longer runs (base64, minified code, URLs) are split so truncation can keep part of them
+MAX_SPAN_CHARS = 16
+TRUNCATION_MARKER = " [...] "
+
+@dataclass
+class AskResult:
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    elapsed: float = 0.0
+    truncated: bool = False
+    error: bool = False
+
+    def footer(self):
+        """One-line usage summary shown under an answer"""
+        note = ", question truncated" if self.truncated else ""
+        return (f"-# {self.model} · {self.prompt_tokens} in / {self.output_tokens} out tokens"
+                f" · {self.elapsed:.1f}s{note}")
+
+def _token_spans(text):
+    """Yield (start, end, cost) for each estimated token group"""
+    for match in TOKEN_RE.finditer(text):
+        start, end = match.span()
+        for piece in range(start, end, MAX_SPAN_CHARS):
+            piece_end = min(piece + MAX_SPAN_CHARS, end)
+            yield piece, piece_end, max(1, (piece_end - piece + 3) // 4)
+
+def estimate_tokens(text):
+    """Approximate the model's token count without a tokenizer"""
+    return sum(cost for _, _, cost in _token_spans(text))
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens, keeping the start and the end of the question
+
+    Returns (text, truncated). Two thirds of the budget go to the head and the
+    rest to the tail, since questions usually end with the actual ask.
+    """
+    spans = list(_token_spans(text))
+    if sum(cost for _, _, cost in spans) <= max_tokens:
+        return text, False
+
+    head_budget = (max_tokens * 2) // 3
+    tail_budget = max_tokens - head_budget
+    head_end = 0
+    used = 0
+    for start, end, cost in spans:
+        if used + cost > head_budget:
+            break
+        used += cost
+        head_end = end
+    tail_start = len(text)
+    used = 0
+    for start, end, cost in reversed(spans):
+        if used + cost > tail_budget or start < head_end:
+            break
+        used += cost
+        tail_start = start
+    return text[:head_end].rstrip() + TRUNCATION_MARKER + text[tail_start:].lstrip(), True
+
+def _payload(prompt, model, budget):
+    options = {'num_predict': budget.output_tokens}
+    # Only sent when set: changing num_ctx between requests makes Ollama reload the model
+    num_ctx = os.getenv('OLLAMA_NUM_CTX')
+    if num_ctx:
+        options['num_ctx'] = int(num_ctx)
+    return {
+        'model': model,
+        'prompt': f"{SYSTEM_PROMPT}\n\nUser: {prompt}",
+        'stream': True,
+        'options': options
+    }
+
+async def ask_ollama_async(prompt, budget=None, model=None, session=None):
+    """Ask Ollama within a token/time budget and return an AskResult, streaming the reply
+
+    Cancelling the awaiting task closes the HTTP stream, which makes Ollama stop
+    generating and free the model for the next request. Pass a shared aiohttp
+    session to reuse connections.
+    """
+    import aiohttp
+
+    budget = budget or default_budget()
+    prompt, truncated = truncate_to_tokens(prompt, budget.input_tokens)
+    started = time.perf_counter()
+    model = model or ollama_model()
+    result = AskResult(text='', model=model, truncated=truncated)
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession()
+    parts = []
     try:
-        payload = {
-            'model': OLLAMA_MODEL,
-            'prompt': f"{SYSTEM_PROMPT}\n\nUser: {prompt}",
-            'stream': False
-        }
-        response = requests.post(OLLAMA_URL, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('response', 'No response received from Ollama')
-        
-    except requests.exceptions.ConnectionError:
-        return "[icon-error] Cannot connect to Ollama server. Make sure Ollama is running on your system."
-    except requests.exceptions.Timeout:
-        return "[icon-timer] Request timed out. Ollama might be busy processing other requests."
-    except requests.exceptions.RequestException as e:
-        return f"[icon-error] Error communicating with Ollama: {str(e)}"
+        async with session.post(ollama_url(), json=_payload(prompt, model, budget),
+                                timeout=aiohttp.ClientTimeout(total=budget.timeout)) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                parts.append(data.get('response', ''))
+                if data.get('done'):
+                    result.prompt_tokens = data.get('prompt_eval_count', 0)
+                    result.output_tokens = data.get('eval_count', 0)
+                    break
+        result.text = ''.join(parts) or 'No response received from Ollama'
+
+    except aiohttp.ClientConnectionError:
+        result.error = True
+        result.text = "[icon-error] Cannot connect to Ollama server. Make sure Ollama is running on your system."
+    except asyncio.TimeoutError:
+        result.error = True
+        result.text = "[icon-timer] Request timed out. Ollama might be busy processing other requests."
+    except aiohttp.ClientError as e:
+        result.error = True
+        result.text = f"[icon-error] Error communicating with Ollama: {str(e)}"
     except Exception as e:
-        return f"[icon-error] Unexpected error: {str(e)}"
+        result.error = True
+        result.text = f"[icon-error] Unexpected error: {str(e)}"
+    finally:
+        if own_session:
+            await session.close()
+    result.elapsed = time.perf_counter() - started
+    return result
+
+def embed(text):
+    """Embedding vector for text from Ollama's embeddings endpoint, or None on failure"""
+    import requests
+
+    try:
+        response = requests.post(
+            ollama_embed_url(), json={'model': ollama_embed_model(), 'prompt': text}, timeout=10
+        )
+        response.raise_for_status()
+        return response.json().get('embedding') or None
+    except (requests.exceptions.RequestException, ValueError):
+        return None
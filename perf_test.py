@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Gate
+Runs offline benchmarks (XP ingest, stats lookup, the streaming ask pipeline against a stub Ollama)
+and fails when p99 latency or throughput regresses past a stored baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import db
+import ollama_client
+from budgets import Budget
+from sender import split_message
+
+DEFAULT_BASELINE = "perf_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_REPEAT = 3
+MIN_DELTA_MS = 0.25  # p99 changes smaller than this are timer noise, not regressions
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/generate like Ollama: a chunked NDJSON stream of reply pieces, then token counts"""
+
+    protocol_version = "HTTP/1.1"  # chunked replies on a kept-alive connection, like Ollama
+    disable_nagle_algorithm = True  # otherwise small chunks wait on delayed ACKs
+    reply = ("Here is a detailed answer. " * 40 + "\n```python\nprint('hello')\n```\n") * 3
+    piece_chars = 16  # roughly what Ollama sends per streamed line
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(0, len(self.reply), self.piece_chars):
+            self._chunk({"model": model, "response": self.reply[i:i + self.piece_chars], "done": False})
+        self._chunk({
+            "model": model,
+            "response": "",
+            "done": True,
+            "prompt_eval_count": len(request.get("prompt", "")) // 4,
+            "eval_count": len(self.reply) // 4,
+        })
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, data):
+        line = json.dumps(data).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def summarize(latencies, wall):
+    """p50/p99 in milliseconds and operations per second"""
+    ordered = sorted(latencies)
+    p99_index = min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))
+    return {
+        "ops": len(ordered),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[p99_index] * 1000,
+        "throughput": len(ordered) / wall if wall > 0 else 0.0,
+    }
+
+
+def run_timed(fn, args_list, warmup=20):
+    for args in args_list[:warmup]:
+        fn(*args)
+    latencies = []
+    started = time.perf_counter()
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def bench_xp_ingest(scale):
+    users = [str(100000000000000000 + i) for i in range(max(1, scale // 10))]
+    return run_timed(db.add_xp, [(users[i % len(users)], 5) for i in range(scale)])
+
+
+def bench_stats_lookup(scale):
+    users = [str(100000000000000000 + i) for i in range(max(1, scale // 10))]
+    return run_timed(db.get_user_stats, [(users[i % len(users)],) for i in range(scale * 5)])
+
+
+def bench_ask_pipeline(scale):
+    """The streaming client !ask uses, on one event loop with a shared session like the bot"""
+    import aiohttp
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    previous_url = os.environ.get('OLLAMA_URL')
+    os.environ['OLLAMA_URL'] = f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+    budget = Budget(input_tokens=512, output_tokens=384, timeout=5)
+    question = "How do I configure the bot for a large server? " * 60
+    loop = asyncio.new_event_loop()
+
+    async def ask_async(prompt, session):
+        result = await ollama_client.ask_ollama_async(prompt, budget, session=session)
+        if result.error:
+            raise RuntimeError(result.text)
+        split_message(f"{result.text}\n{result.footer()}")
+
+    session = loop.run_until_complete(_make_session(aiohttp))
+    try:
+        return run_timed(lambda prompt: loop.run_until_complete(ask_async(prompt, session)),
+                         [(question,)] * max(1, scale // 10), warmup=5)
+    finally:
+        loop.run_until_complete(session.close())
+        loop.close()
+        if previous_url is None:
+            os.environ.pop('OLLAMA_URL', None)
+        else:
+            os.environ['OLLAMA_URL'] = previous_url
+        server.shutdown()
+        server.server_close()
+
+
+async def _make_session(aiohttp):
+    # Created inside the loop it will be used on
+    return aiohttp.ClientSession()
+
+
+BENCHMARKS = {
+    "xp_ingest": bench_xp_ingest,
+    "stats_lookup": bench_stats_lookup,
+    "ask_pipeline": bench_ask_pipeline,
+}
+
+
+def best_of(runs):
+    """Least noisy view of repeated runs: lowest latencies, highest throughput"""
+    return {
+        "ops": runs[0]["ops"],
+        "p50_ms": min(r["p50_ms"] for r in runs),
+        "p99_ms": min(r["p99_ms"] for r in runs),
+        "throughput": max(r["throughput"] for r in runs),
+    }
+
+
+def run_benchmarks(names, scale, repeat=DEFAULT_REPEAT):
+    """Run benchmarks against a throwaway database so the live one is never touched"""
+    results = {}
+    previous_path = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "perf.db")
+        try:
+            db.init_db()
+            for name in names:
+                results[name] = best_of([BENCHMARKS[name](scale) for _ in range(max(1, repeat))])
+        finally:
+            db.DB_PATH = previous_path
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages (empty if everything is within tolerance)"""
+    failures = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        allowed_p99 = max(base["p99_ms"] * (1 + tolerance), base["p99_ms"] + MIN_DELTA_MS)
+        if current["p99_ms"] > allowed_p99:
+            failures.append(f"{name}: p99 {current['p99_ms']:.2f} ms vs baseline {base['p99_ms']:.2f} ms")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            failures.append(f"{name}: throughput {current['throughput']:.0f}/s vs baseline {base['throughput']:.0f}/s")
+    return failures
+
+
+def print_results(results, baseline):
+    print(f"{'benchmark':<14}{'ops':>8}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>12}{'base p99':>10}{'base ops/s':>12}")
+    for name, r in results.items():
+        base = baseline.get(name, {})
+        base_p99 = f"{base['p99_ms']:.2f}" if base else "-"
+        base_tp = f"{base['throughput']:.0f}" if base else "-"
+        print(f"{name:<14}{r['ops']:>8}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['throughput']:>12.0f}"
+              f"{base_p99:>10}{base_tp:>12}")
+
+
+def main(argv=None):
+    """Entry point"""
+    os.chdir(Path(__file__).parent)
+    parser = argparse.ArgumentParser(description="Artifact Discord Bot performance regression gate")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative regression in p99 and throughput (default 0.25)")
+    parser.add_argument("--scale", type=int, default=2000, help="Operations per benchmark")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark (best is kept)")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run selected benchmarks")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    print("📈 Artifact Discord Bot Performance Gate")
+    print("=" * 50)
+    results = run_benchmarks(args.only or list(BENCHMARKS), args.scale, args.repeat)
+
+    baseline_path = Path(args.baseline)
+    stored = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    baseline = stored.get("results", {})
+    print_results(results, baseline)
+
+    if args.update_baseline or not baseline:
+        merged = dict(baseline, **results)
+        baseline_path.write_text(json.dumps({
+            "recorded": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "scale": args.scale,
+            "results": merged,
+        }, indent=2) + "\n")
+        print(f"\n💾 Baseline written to {baseline_path}")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance)
+    if failures:
+        print(f"\n❌ Performance regression beyond {args.tolerance:.0%}:")
+        for failure in failures:
+            print(f"  • {failure}")
+        return 1
+    print(f"\n✅ All benchmarks within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
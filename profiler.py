@@ -0,0 +1,90 @@
+"""
+On-demand CPU profiling for the running bot
+Enables cProfile on the event loop thread for a fixed window, then writes a
+.prof file for offline analysis and returns the top functions by cumulative time.
+Nothing is hooked in while no profile is running, so it costs nothing when off.
+"""
+
+import asyncio
+import cProfile
+import os
+import pstats
+from datetime import datetime
+from pathlib import Path
+
+MAX_SECONDS = 300
+DEFAULT_TOP = 15
+PROFILE_PREFIX = 'profile-'
+
+_running = False
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def top_functions(stats, limit=DEFAULT_TOP):
+    """[(cumtime, tottime, calls, 'file:line(function)')] sorted by cumulative time"""
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        if filename == '~':
+            location = name  # built-ins have no source file
+        else:
+            location = f"{Path(filename).name}:{line}({name})"
+        rows.append((cumtime, tottime, calls, location))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def format_report(rows, seconds, path):
+    lines = [f"{'cumulative':>10} {'own':>8} {'calls':>8}  function"]
+    for cumtime, tottime, calls, location in rows:
+        lines.append(f"{cumtime:>9.3f}s {tottime:>7.3f}s {calls:>8}  {location}")
+    lines.append(f"{seconds:.0f}s window, saved to {path}")
+    return "\n".join(lines)
+
+
+async def profile_for(seconds, top=DEFAULT_TOP, directory=None):
+    """Profile the event loop for `seconds`; returns (report_text, prof_path)
+
+    Raises ProfilerBusy if a profile is already running.
+    """
+    global _running
+    if _running:
+        raise ProfilerBusy("A profile is already running")
+    seconds = max(1.0, min(float(seconds), MAX_SECONDS))
+    directory = Path(directory or os.getenv('PROFILE_DIR', 'profiles'))
+    _running = True
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+    finally:
+        _running = False
+
+    path = directory / f"{PROFILE_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+    # Sorting and writing a big profile takes a while; keep it off the event loop
+    loop = asyncio.get_event_loop()
+    keep = int(os.getenv('PROFILE_KEEP', '10'))
+    report = await loop.run_in_executor(None, _save, profile, path, top, seconds, keep)
+    return report, path
+
+
+def prune_profiles(directory, keep):
+    """Delete all but the newest `keep` .prof files and return the removed paths"""
+    profiles = sorted(Path(directory).glob(f"{PROFILE_PREFIX}*.prof"))
+    stale = profiles[:-keep] if keep > 0 else []
+    for path in stale:
+        path.unlink()
+    return stale
+
+
+def _save(profile, path, top, seconds, keep):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stats = pstats.Stats(profile)
+    stats.dump_stats(str(path))
+    prune_profiles(path.parent, keep)
+    return format_report(top_functions(stats, top), seconds, path)
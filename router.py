@@ -0,0 +1,134 @@
+"""
+Latency-tiered model routing for !ask
+Picks a fast, primary or large model from cheap prompt features and steps down
+to a faster model when the chosen one is backed up or missing its latency SLO
+"""
+
+import os
+import re
+import time
+from collections import deque
+
+from ollama_client import estimate_tokens, ollama_model
+
+CODE_RE = re.compile(
+    r"```|`[^`]+`|^\s*(def|class|import|from|function|const|let|var|public|#include)\b|[;{}]\s*$|=>|::",
+    re.MULTILINE
+)
+DEFAULT_KEYWORDS = "explain,debug,error,traceback,code,algorithm,compare,design,architecture,optimize,why"
+LATENCY_SAMPLES = 20
+LATENCY_MAX_AGE = 120.0  # seconds; old samples expire so a slow model gets retried
+
+
+class ModelLoad:
+    """In-flight count and recent latencies for one model"""
+
+    def __init__(self):
+        self.inflight = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, elapsed):
+        self.latencies.append((time.monotonic(), elapsed))
+
+    def p90(self):
+        cutoff = time.monotonic() - LATENCY_MAX_AGE
+        recent = sorted(elapsed for stamp, elapsed in self.latencies if stamp >= cutoff)
+        if not recent:
+            return 0.0
+        return recent[int(0.9 * (len(recent) - 1))]
+
+
+class ModelRouter:
+    """Routes each question to a model tier and records which model answered"""
+
+    def __init__(self, primary, fast=None, large=None, short_tokens=24, long_tokens=200,
+                 keywords=(), large_roles=(), max_inflight=2, slo_seconds=10.0):
+        self.primary = primary
+        self.fast = fast or primary
+        self.large = large or primary
+        self.short_tokens = short_tokens
+        self.long_tokens = long_tokens
+        self.keywords = {k.strip().lower() for k in keywords if k.strip()}
+        self.large_roles = {str(r) for r in large_roles}
+        self.max_inflight = max_inflight
+        self.slo_seconds = slo_seconds
+        self.loads = {}
+        self.routed = {}
+
+    @classmethod
+    def from_env(cls):
+        def env_list(name, default=''):
+            return [item for item in os.getenv(name, default).split(',') if item.strip()]
+
+        return cls(
+            primary=ollama_model(),
+            fast=os.getenv('OLLAMA_FAST_MODEL'),
+            large=os.getenv('OLLAMA_LARGE_MODEL'),
+            short_tokens=int(os.getenv('ROUTER_SHORT_TOKENS', '24')),
+            long_tokens=int(os.getenv('ROUTER_LONG_TOKENS', '200')),
+            keywords=env_list('ROUTER_KEYWORDS', DEFAULT_KEYWORDS),
+            large_roles=env_list('ROUTER_LARGE_ROLES'),
+            max_inflight=int(os.getenv('ROUTER_MAX_INFLIGHT', '2')),
+            slo_seconds=float(os.getenv('ROUTER_SLO_SECONDS', '10')),
+        )
+
+    def load(self, model):
+        return self.loads.setdefault(model, ModelLoad())
+
+    def overloaded(self, model):
+        """Queue too deep, or recent p90 latency above the SLO"""
+        load = self.load(model)
+        return load.inflight >= self.max_inflight or load.p90() > self.slo_seconds
+
+    def classify(self, prompt, role_ids=()):
+        """Preferred model and a short reason, from prompt features alone"""
+        tokens = estimate_tokens(prompt)
+        has_code = bool(CODE_RE.search(prompt))
+        words = set(re.findall(r"[a-z]+", prompt.lower()))
+        keyword_hit = bool(self.keywords & words)
+        if any(str(r) in self.large_roles for r in role_ids):
+            return self.large, "role tier"
+        if has_code:
+            return self.large, "code"
+        if tokens > self.long_tokens:
+            return self.large, f"long ({tokens} tokens)"
+        if tokens <= self.short_tokens and not keyword_hit:
+            return self.fast, f"short ({tokens} tokens)"
+        if keyword_hit:
+            return self.large, "technical keywords"
+        return self.primary, "default"
+
+    def choose(self, prompt, role_ids=()):
+        """Model to use now: the preferred tier, stepping down while it is overloaded"""
+        preferred, reason = self.classify(prompt, role_ids)
+        ladder = [self.large, self.primary, self.fast]
+        candidates = ladder[ladder.index(preferred):]
+        for model in candidates:
+            if not self.overloaded(model):
+                if model != preferred:
+                    reason += f", fell back from {preferred}"
+                return model, reason
+        return self.fast, reason + ", all tiers overloaded"
+
+    def begin(self, model):
+        self.load(model).inflight += 1
+
+    def finish(self, model, elapsed, ok=True):
+        """Release the in-flight slot; timeouts and errors still count against the SLO
+
+        Pass elapsed=None for a cancelled generation, which says nothing about latency.
+        """
+        load = self.load(model)
+        load.inflight = max(0, load.inflight - 1)
+        if elapsed is not None:
+            load.record(elapsed)
+        if ok:
+            self.routed[model] = self.routed.get(model, 0) + 1
+
+    def snapshot(self):
+        """Per-model in-flight, p90 latency and answer counts for diagnostics"""
+        return {
+            model: {'inflight': load.inflight, 'p90': load.p90(), 'answered': self.routed.get(model, 0)}
+            for model, load in self.loads.items()
+        }
+
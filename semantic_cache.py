@@ -0,0 +1,255 @@
+"""
+Semantic answer cache for !ask
+Stores question embeddings in a memory-mapped NumPy matrix and answers in SQLite, so
+differently-phrased repeats of a question can be answered without a new generation
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Imported on first use: numpy is optional and slow to import, and the cache is off by default
+np = None
+
+INITIAL_CAPACITY = 1024
+COMPACT_RATIO = 0.25    # compact once this fraction of scanned rows are dead
+EVICT_FRACTION = 0.1    # share of entries dropped when the cache is full
+SKETCH_DIM = 64         # random-projection width scanned on every lookup
+RERANK = 64             # sketch candidates re-scored against the full vectors
+
+
+def _load_numpy():
+    """Import numpy into the module on first use; False if it isn't installed"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+class SemanticCache:
+    """Cosine-similarity lookup over normalized float32 question vectors
+
+    Rows are appended to vectors.f32 and never moved on insert; evictions mark
+    rows dead and compaction packs the live rows back together so a lookup
+    only scans `size` rows. Lookups scan a 64-wide random projection of every
+    row (sketches.f32) and re-score only the best candidates at full width,
+    which keeps a 100k-entry scan to about 26 MB of memory traffic (100k x 64 x 4 B)
+    instead of about 300 MB at 768 dimensions.
+    """
+
+    def __init__(self, directory, threshold=0.92, max_entries=100000, ttl_seconds=0):
+        if not _load_numpy():
+            raise RuntimeError("numpy is required for the semantic cache")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.db = sqlite3.connect(str(self.directory / 'answers.db'), check_same_thread=False)
+        # It's a cache: trade durability of the last few hits for a cheap commit on every lookup
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('''CREATE TABLE IF NOT EXISTS entries (
+                               slot INTEGER PRIMARY KEY,
+                               question TEXT,
+                               answer TEXT,
+                               created REAL,
+                               last_used REAL,
+                               hits INTEGER DEFAULT 0
+                           )''')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)')
+        self.db.commit()
+        meta = dict(self.db.execute('SELECT key, value FROM meta'))
+        self.dim = meta.get('dim')
+        self.capacity = meta.get('capacity', 0)
+        self.vectors = None
+        self.sketches = None
+        self.projection = None
+        self.size = 0
+        self.active = np.zeros(0, dtype=bool)
+        self.last_used = np.zeros(0, dtype=np.float64)
+        if self.dim:
+            self._open_vectors()
+            for slot, last_used in self.db.execute('SELECT slot, last_used FROM entries'):
+                self.active[slot] = True
+                self.last_used[slot] = last_used
+                self.size = max(self.size, slot + 1)
+
+    @classmethod
+    def from_env(cls):
+        """Build the cache from SEMANTIC_CACHE_* settings, or None if disabled/unavailable"""
+        if os.getenv('SEMANTIC_CACHE', 'false').lower() not in ('1', 'true', 'yes', 'on'):
+            return None
+        if not _load_numpy():
+            logging.warning("SEMANTIC_CACHE is enabled but numpy is not installed; cache disabled")
+            return None
+        return cls(
+            os.getenv('SEMANTIC_CACHE_DIR', 'semantic_cache'),
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92')),
+            max_entries=int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '100000')),
+            ttl_seconds=3600 * float(os.getenv('SEMANTIC_CACHE_TTL_HOURS', '0')),
+        )
+
+    def __len__(self):
+        return int(self.active[:self.size].sum())
+
+    def _map(self, path, width):
+        needed = self.capacity * width * 4
+        with open(path, 'ab') as f:
+            if f.tell() < needed:
+                f.truncate(needed)
+        return np.memmap(path, dtype=np.float32, mode='r+', shape=(self.capacity, width))
+
+    def _open_vectors(self):
+        """(Re)map the vector files at the current capacity, growing them if needed"""
+        if self.projection is None:
+            # Fixed seed so sketches stay valid across restarts
+            rng = np.random.default_rng(0)
+            self.projection = rng.standard_normal((self.dim, SKETCH_DIM)).astype(np.float32)
+        self.vectors = self._map(self.directory / 'vectors.f32', self.dim)
+        self.sketches = self._map(self.directory / 'sketches.f32', SKETCH_DIM)
+        if len(self.active) < self.capacity:
+            self.active = np.concatenate([self.active, np.zeros(self.capacity - len(self.active), dtype=bool)])
+            self.last_used = np.concatenate(
+                [self.last_used, np.zeros(self.capacity - len(self.last_used), dtype=np.float64)]
+            )
+
+    def _set_meta(self):
+        self.db.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                            (('dim', self.dim), ('capacity', self.capacity)))
+
+    @staticmethod
+    def _normalize(vector):
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def _sketch(self, unit_vector):
+        return self._normalize(unit_vector @ self.projection)
+
+    def _best_match(self, query):
+        """Closest live slot and its exact cosine similarity, or (None, -1)"""
+        if self.size <= RERANK:
+            candidates = np.flatnonzero(self.active[:self.size])
+        else:
+            rough = self.sketches[:self.size] @ self._sketch(query)
+            candidates = np.argpartition(rough, -RERANK)[-RERANK:]
+            candidates = candidates[self.active[candidates]]
+        if not len(candidates):
+            return None, -1.0
+        scores = self.vectors[candidates] @ query
+        best = int(np.argmax(scores))
+        return int(candidates[best]), float(scores[best])
+
+    def lookup(self, vector):
+        """Return (answer, similarity) for the closest live entry above the threshold, else None"""
+        with self.lock:
+            if not self.size or self.dim is None or len(vector) != self.dim:
+                self.misses += 1
+                return None
+            slot, score = self._best_match(self._normalize(vector))
+            now = time.time()
+            if slot is None or score < self.threshold:
+                self.misses += 1
+                return None
+            if self.ttl and now - self.last_used[slot] > self.ttl:
+                self._evict([slot])
+                self.db.commit()
+                self.misses += 1
+                return None
+            row = self.db.execute('SELECT answer FROM entries WHERE slot = ?', (slot,)).fetchone()
+            self.last_used[slot] = now
+            self.db.execute('UPDATE entries SET last_used = ?, hits = hits + 1 WHERE slot = ?', (now, slot))
+            self.db.commit()
+            self.hits += 1
+            return (row[0], score) if row else None
+
+    def insert(self, question, vector, answer):
+        """Cache an answer under its question's embedding"""
+        with self.lock:
+            if self.dim is None:
+                self.dim = len(vector)
+                self.capacity = INITIAL_CAPACITY
+                self._open_vectors()
+            elif len(vector) != self.dim:
+                logging.warning(f"Semantic cache dimension mismatch ({len(vector)} != {self.dim}); not cached")
+                return
+
+            live = int(self.active[:self.size].sum())
+            if live >= self.max_entries:
+                oldest = np.flatnonzero(self.active[:self.size])
+                oldest = oldest[np.argsort(self.last_used[oldest])]
+                self._evict(oldest[:max(1, int(self.max_entries * EVICT_FRACTION))].tolist())
+            if self.size and (self.size - int(self.active[:self.size].sum())) / self.size > COMPACT_RATIO:
+                self._compact()
+            if self.size >= self.capacity:
+                if (self.size - int(self.active[:self.size].sum())) > 0:
+                    self._compact()
+                if self.size >= self.capacity:
+                    self.capacity *= 2
+                    self.vectors.flush()
+                    self.sketches.flush()
+                    self._open_vectors()
+
+            slot = self.size
+            now = time.time()
+            unit = self._normalize(vector)
+            self.vectors[slot] = unit
+            self.sketches[slot] = self._sketch(unit)
+            self.active[slot] = True
+            self.last_used[slot] = now
+            self.size += 1
+            self.db.execute(
+                'INSERT OR REPLACE INTO entries (slot, question, answer, created, last_used) VALUES (?, ?, ?, ?, ?)',
+                (slot, question, answer, now, now)
+            )
+            self._set_meta()
+            self.db.commit()
+
+    def _evict(self, slots):
+        self.active[slots] = False
+        self.db.executemany('DELETE FROM entries WHERE slot = ?', ((s,) for s in slots))
+
+    def _compact(self):
+        """Pack live rows to the front of the matrix so lookups scan fewer rows"""
+        live = np.flatnonzero(self.active[:self.size])
+        count = len(live)
+        self.vectors[:count] = self.vectors[live]
+        self.sketches[:count] = self.sketches[live]
+        self.last_used[:count] = self.last_used[live]
+        self.active[:count] = True
+        self.active[count:self.size] = False
+        # Ascending order guarantees each target slot is already free
+        self.db.executemany('UPDATE entries SET slot = ? WHERE slot = ?',
+                            ((new, int(old)) for new, old in enumerate(live) if new != old))
+        self.size = count
+        self.vectors.flush()
+        self.sketches.flush()
+        logging.info(f"Semantic cache compacted to {count} entries")
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+            self.db.commit()
+
+    def stats(self):
+        return {'entries': len(self), 'rows': self.size, 'capacity': self.capacity,
+                'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self.lock:
+            if self.vectors is not None:
+                self.vectors.flush()
+                self.sketches.flush()
+            self.db.close()
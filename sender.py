@@ -0,0 +1,200 @@
+"""
+Outbound message layer for Discord replies
+Splits long text on markdown boundaries and paces sends per channel so replies never trip 429s
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+
+MESSAGE_LIMIT = 2000
+CHANNEL_RATE = 5        # messages per channel...
+CHANNEL_PER = 5.0       # ...per this many seconds (Discord's message route bucket)
+GLOBAL_RATE = 50        # requests per second across the whole bot
+IDLE_TIMEOUT = 30.0     # seconds before an idle channel worker exits
+
+FENCE_RE = re.compile(r'^\s*(```+|~~~+)(.*)$')
+MAX_FENCE_PREFIX = 32   # longest marker + language tag repeated when a block is reopened
+
+
+def _split_line(line, limit):
+    """Break one over-long line at the last whitespace before the limit"""
+    parts = []
+    while len(line) > limit:
+        cut = line.rfind(' ', 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(line[:cut])
+        line = line[cut:].lstrip(' ')
+    parts.append(line)
+    return parts
+
+
+def _fence_prefix(match):
+    """Marker plus language tag to reopen a block with; the rest of the opening line is not repeated"""
+    marker = match.group(1)
+    words = match.group(2).split()
+    prefix = marker + (words[0] if words else '')
+    return prefix if len(prefix) <= MAX_FENCE_PREFIX else marker
+
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """Split text into chunks of at most `limit` characters
+
+    Chunks break between lines where possible, falling back to word
+    boundaries. A code block cut across chunks is closed at the end of one
+    chunk and reopened, with the same language tag, at the start of the next.
+    """
+    if len(text) <= limit:
+        return [text] if text else []
+
+    chunks = []
+    lines = []
+    size = 0
+    fence = None    # opening fence line while inside a code block
+    closer = ''     # matching closing marker for that block
+
+    for raw_line in text.split('\n'):
+        next_fence, next_closer = fence, closer
+        match = FENCE_RE.match(raw_line)
+        # Absurdly long backtick runs are left as text rather than repeated in every chunk
+        if match and len(match.group(1)) <= MAX_FENCE_PREFIX:
+            if fence is None:
+                next_fence, next_closer = _fence_prefix(match), match.group(1)
+            elif not match.group(2).strip():
+                next_fence, next_closer = None, ''
+
+        # Room for the closing marker if the chunk ends inside a block after this line
+        reserve = len(next_closer) + 1 if next_fence else 0
+        reopen = len(fence) + 1 if fence else 0
+        for piece in _split_line(raw_line, max(1, limit - reserve - reopen)):
+            if lines and size + 1 + len(piece) + reserve > limit:
+                chunks.append('\n'.join(lines) + ('\n' + closer if fence else ''))
+                lines = [fence] if fence else []
+                size = len(fence) if fence else 0
+            size += len(piece) + (1 if lines else 0)
+            lines.append(piece)
+
+        fence, closer = next_fence, next_closer
+
+    if lines:
+        chunks.append('\n'.join(lines))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+class RateBucket:
+    """Sliding-window limiter: at most `rate` acquisitions per `per` seconds"""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.stamps = deque()
+
+    def delay(self):
+        now = time.monotonic()
+        while self.stamps and now - self.stamps[0] >= self.per:
+            self.stamps.popleft()
+        if len(self.stamps) < self.rate:
+            return 0.0
+        return self.per - (now - self.stamps[0])
+
+    async def acquire(self):
+        while True:
+            wait = self.delay()
+            if wait <= 0:
+                self.stamps.append(time.monotonic())
+                return
+            await asyncio.sleep(wait)
+
+
+class OutboundQueue:
+    """Per-channel send queues paced against channel and global rate limits"""
+
+    def __init__(self, channel_rate=CHANNEL_RATE, channel_per=CHANNEL_PER,
+                 global_rate=GLOBAL_RATE, limit=MESSAGE_LIMIT):
+        self.channel_rate = channel_rate
+        self.channel_per = channel_per
+        self.limit = limit
+        self.global_bucket = RateBucket(global_rate, 1.0)
+        self._queues = {}
+        self._buckets = {}
+
+    def _channel_key(self, channel):
+        return getattr(channel, 'id', None) or id(channel)
+
+    def send(self, channel, content=None, **kwargs):
+        """Queue one message and return a future resolving to the sent message"""
+        key = self._channel_key(channel)
+        future = asyncio.get_event_loop().create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            asyncio.get_event_loop().create_task(self._worker(key, channel, queue))
+        queue.put_nowait((content, kwargs, future))
+        return future
+
+    async def send_long(self, channel, text, **kwargs):
+        """Split text for Discord, queue every chunk and wait until all are delivered"""
+        chunks = split_message(text, self.limit)
+        if not chunks:
+            return []
+        # Attach embeds, references etc. to the first chunk only
+        futures = [self.send(channel, chunks[0], **kwargs)]
+        futures.extend(self.send(channel, chunk) for chunk in chunks[1:])
+        return await asyncio.gather(*futures)
+
+    def _take_mergeable(self, queue, content):
+        """Pull queued plain-text messages that fit alongside `content` in one send
+
+        Returns (content, futures, held): the first queued message that can't be
+        merged is taken off the queue anyway and handed back to be sent next.
+        """
+        merged = [content]
+        size = len(content)
+        futures = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            next_content, next_kwargs, next_future = item
+            if next_kwargs or not next_content or size + 1 + len(next_content) > self.limit:
+                return '\n'.join(merged), futures, item
+            merged.append(next_content)
+            size += 1 + len(next_content)
+            futures.append(next_future)
+        return '\n'.join(merged), futures, None
+
+    async def _worker(self, key, channel, queue):
+        bucket = self._buckets.setdefault(key, RateBucket(self.channel_rate, self.channel_per))
+        held = None
+        while True:
+            if held is not None:
+                (content, kwargs, future), held = held, None
+            else:
+                try:
+                    content, kwargs, future = await asyncio.wait_for(queue.get(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        del self._queues[key]
+                        self._buckets.pop(key, None)
+                        return
+                    continue
+
+            futures = [future]
+            if content and not kwargs:
+                content, extra, held = self._take_mergeable(queue, content)
+                futures.extend(extra)
+
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                message = await channel.send(content, **kwargs)
+            except Exception as e:
+                logging.error(f"Outbound send to {key} failed: {e}")
+                for f in futures:
+                    if not f.done():
+                        f.set_exception(e)
+                continue
+            for f in futures:
+                if not f.done():
+                    f.set_result(message)
@@ -93,20 +93,20 @@ def check_database():
             conn = sqlite3.connect(str(db_path))
             cursor = conn.cursor()
             
-            # Check users table
-            cursor.execute("SELECT COUNT(*) FROM users")
-            user_count = cursor.fetchone()[0]
+            # Server-wide totals are kept in a summary table by triggers; older
+            # databases without it fall back to scanning users
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'server_stats'")
+            if cursor.fetchone():
+                cursor.execute("SELECT user_count, total_xp FROM server_stats WHERE id = 1")
+                user_count, total_xp = cursor.fetchone() or (0, 0)
+                cursor.execute("SELECT MAX(level) FROM level_counts")
+                max_level = cursor.fetchone()[0] or 0
+            else:
+                cursor.execute("SELECT COUNT(*), SUM(xp), MAX(level) FROM users")
+                user_count, total_xp, max_level = cursor.fetchone()
             print(f"  📊 Total users: {user_count}")
-            
-            # Check total XP
-            cursor.execute("SELECT SUM(xp) FROM users")
-            total_xp = cursor.fetchone()[0] or 0
-            print(f"  🏆 Total XP distributed: {total_xp}")
-            
-            # Check highest level user
-            cursor.execute("SELECT MAX(level) FROM users")
-            max_level = cursor.fetchone()[0] or 0
-            print(f"  🥇 Highest user level: {max_level}")
+            print(f"  🏆 Total XP distributed: {total_xp or 0}")
+            print(f"  🥇 Highest user level: {max_level or 0}")
             
             conn.close()
             
@@ -183,6 +183,35 @@ def check_ollama_connection():
         
     print()
 
+def check_status_endpoint():
+    """Query the running bot's local status endpoint (STATUS_PORT)"""
+    print("📡 Bot Status Endpoint:")
+
+    from dotenv import dotenv_values
+
+    port = os.getenv("STATUS_PORT") or dotenv_values(".env").get("STATUS_PORT")
+    if not port or port == "0":
+        print("  ⚠️  STATUS_PORT not set (endpoint disabled)")
+        print()
+        return
+
+    try:
+        response = requests.get(f"http://127.0.0.1:{port}/status", timeout=5)
+        data = response.json()
+        print(f"  ✅ Bot responding as {data.get('user') or 'not logged in'}")
+        if data.get("latency_ms") is not None:
+            print(f"  📶 Gateway latency: {data['latency_ms']:.0f} ms")
+        print(f"  🏠 Guilds: {data.get('guilds', 0)}")
+        print(f"  ❓ Questions in flight: {data.get('inflight_questions', 0)}")
+        for model, load in (data.get("models") or {}).items():
+            print(f"     • {model}: {load['answered']} answered, p90 {load['p90']:.1f}s")
+    except requests.exceptions.ConnectionError:
+        print(f"  ❌ Nothing listening on port {port} (is the bot running?)")
+    except Exception as e:
+        print(f"  ❌ Status endpoint error: {str(e)}")
+
+    print()
+
 def check_running_processes():
     """Check for running Discord bot processes"""
     print("🔄 Running Processes:")
@@ -259,6 +288,7 @@ def main():
     check_cpp_sdk()
     check_ollama_connection()
     check_running_processes()
+    check_status_endpoint()
     check_network_connectivity()
     print_recommendations()
     
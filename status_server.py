@@ -0,0 +1,63 @@
+"""
+Local status endpoint for the running bot
+Serves GET /status (JSON health and load) and GET /profile?seconds=N (CPU profile)
+on localhost when STATUS_PORT is set
+"""
+
+import logging
+import os
+import time
+
+from cache_policy import current_rss
+from profiler import DEFAULT_TOP, ProfilerBusy, profile_for
+
+
+def status_snapshot(bot):
+    """Health and load figures for /status"""
+    return {
+        'user': str(bot.user) if bot.user else None,
+        'ready': bot.is_ready(),
+        'ready_seconds': bot.ready_seconds,
+        'uptime_seconds': time.time() - bot.started_at,
+        'latency_ms': bot.latency * 1000 if bot.is_ready() else None,
+        'guilds': len(bot.guilds),
+        'rss': current_rss(),
+        'inflight_questions': len(bot.inflight),
+        'cancelled_questions': bot.inflight.cancelled,
+        'models': bot.router.snapshot(),
+        'extensions': sorted(bot.extensions),
+    }
+
+
+async def start_status_server(bot):
+    """Start the endpoint if STATUS_PORT is set; returns the aiohttp runner or None"""
+    port = int(os.getenv('STATUS_PORT', '0'))
+    if not port:
+        return None
+    from aiohttp import web
+
+    async def status(request):
+        return web.json_response(status_snapshot(bot))
+
+    async def profile(request):
+        try:
+            seconds = float(request.query.get('seconds', '10'))
+            top = int(request.query.get('top', str(DEFAULT_TOP)))
+        except ValueError:
+            return web.Response(status=400, text="seconds and top must be numbers\n")
+        try:
+            report, _ = await profile_for(seconds, top)
+        except ProfilerBusy as e:
+            return web.Response(status=409, text=f"{e}\n")
+        return web.Response(text=report + "\n")
+
+    app = web.Application()
+    app.router.add_get('/status', status)
+    app.router.add_get('/profile', profile)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    # Localhost only by default: /profile is an admin operation
+    host = os.getenv('STATUS_HOST', '127.0.0.1')
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"Status endpoint listening on http://{host}:{port}/status")
+    return runner
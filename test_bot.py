@@ -5,6 +5,7 @@ Comprehensive testing of all bot functionality
 import asyncio
 import os
 import sqlite3
+import time
 from datetime import datetime
 
 import discord
@@ -162,6 +163,76 @@ class BotTester:
         
         return all(tests)
     
+    def test_message_splitting(self):
+        """Test that long replies split within Discord's limit with code blocks kept intact (offline)"""
+        print("\n✂️ Testing Message Splitting...")
+
+        from sender import MESSAGE_LIMIT, split_message
+
+        code = "\n".join(f"print({i})  # step {i}" for i in range(300))
+        cases = {
+            "code block": f"Here you go:\n```python\n{code}\n```\nDone.",
+            "long fence line": "```python " + "x" * 2500 + "\n" + code + "\n```",
+            "one long paragraph": "word " * 1000,
+            "one long word": "a" * 5000,
+        }
+        failures = []
+        for name, text in cases.items():
+            chunks = split_message(text)
+            if not chunks or max(len(chunk) for chunk in chunks) > MESSAGE_LIMIT:
+                failures.append(f"{name}: chunk over {MESSAGE_LIMIT} characters")
+            if name == "code block":
+                # Every chunk that opens a block closes it, and continuations reopen with the tag
+                if any(chunk.count("```") % 2 for chunk in chunks):
+                    failures.append(f"{name}: unbalanced fences")
+                if not all(chunk.startswith("```python") for chunk in chunks[1:-1]):
+                    failures.append(f"{name}: code block not reopened with its language")
+            if name == "one long paragraph" and any(set(chunk.split()) != {"word"} for chunk in chunks):
+                failures.append(f"{name}: not split on word boundaries")
+            if name == "one long word" and "".join(chunks) != text:
+                failures.append(f"{name}: characters lost")
+        if failures:
+            print(f"❌ Message splitting test failed: {failures}")
+            return False
+        print(f"✅ Message splitting test successful ({len(cases)} cases)")
+        return True
+
+    def test_moderation(self):
+        """Test the blocklist pre-filter against punctuation and obfuscations (offline)"""
+        print("\n🛡️ Testing Moderation Filter...")
+
+        from moderation import compile_blocklist, fold, fold_leet, normalize
+
+        terms, raw = compile_blocklist(['idiot', 'shit', 'hell', 'ass', 'cum', 'tit', 'scam*', 're:free\\s+nitro'])
+
+        def matches(text):
+            text = normalize(text)
+            return bool(terms.search(fold(text)) or raw.search(fold_leet(text)))
+
+        should_match = [
+            "you idiot!", "you IDIOT!!", "@idiot hi", "what an idiot$", "(idiot)", "!idiot?",
+            "idiot.", "1d10t", "id!ot", "i.d.i.o.t", "i_d_i_o_t", "i d i o t", "iiidiot", "ïdíót!",
+            "sh!t", "$hit", "s h i t!", "$ h ! t", "a.s.s", "a$$", "scammers!", "free nitro!",
+        ]
+        should_pass = [
+            "idiotic", "idiots", "hi there", "escam", "free for all", "class", "hello",
+            "he'll be late", "as soon as s", "cu m", "ti t", "I a m here",
+        ]
+        failures = [text for text in should_match if not matches(text)]
+        failures += [text for text in should_pass if matches(text)]
+        # Runs of leetspeak symbols must not make a search slower than linear
+        for text in ('!' * 2000, '$' * 2000, 's.' * 2000 + 'x'):
+            started = time.perf_counter()
+            matches(text)
+            elapsed = time.perf_counter() - started
+            if elapsed > 0.05:
+                failures.append(f"{text[:4]}... took {elapsed * 1000:.0f} ms")
+        if failures:
+            print(f"❌ Moderation test failed for: {failures}")
+            return False
+        print(f"✅ Moderation filter test successful ({len(should_match) + len(should_pass) + 3} cases)")
+        return True
+
     async def run_all_tests(self):
         """Run all tests"""
         print("🧪 Discord Bot Test Suite")
@@ -174,6 +245,12 @@ class BotTester:
         # Configuration test
         results.append(self.test_configuration())
         
+        # Message splitting test
+        results.append(self.test_message_splitting())
+
+        # Moderation filter test
+        results.append(self.test_moderation())
+
         # Database test
         results.append(self.test_database())
         